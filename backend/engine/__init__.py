@@ -4,3 +4,38 @@ Core components for chess game logic, move generation, and AI search.
 """
 
 __version__ = "0.1.0"
+
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) every jitted kernel up front.
+
+    Exercises board setup, move generation, make/unmake and evaluation once
+    with real signatures, so the first search doesn't pay JIT latency.
+    Imports are local to keep plain `import engine` cheap.
+    """
+    import time
+
+    from engine.board import Board
+    from engine.moves import Moves
+    from engine.evaluation import evaluate
+    from engine.search import Search
+
+    board = Board()
+    moves_gen = Moves(board)
+    legal_moves = moves_gen.generate()
+    moves_gen.is_check()
+    undo = board.make_move(legal_moves[0])
+    evaluate(board.state)
+    board.unmake_move(legal_moves[0], undo)
+    null_undo = board.make_null_move()
+    board.unmake_null_move(null_undo)
+
+    # Search kernels too: a silent shallow negamax compiles the move
+    # scorer, lazy picker, TT probe/store and quiescence, so the first
+    # real search starts at full speed (Search.search itself would
+    # print UCI info lines, hence the direct _negamax call)
+    searcher = Search(tt_size_mb=1)
+    searcher.stats.start_time = time.time()
+    searcher.tt.new_search()
+    searcher._negamax(board, 2, -Search.MATE_SCORE, Search.MATE_SCORE)
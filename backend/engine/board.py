@@ -2,12 +2,17 @@
 Board Representation - Bitboard Implementation
 Pure numpy + numba for maximum performance. Zero Python overhead.
 
-State Array Layout (20 × uint64):
+State Array Layout (28 × uint64):
   [0-5]:   White pieces [Pawn, Knight, Bishop, Rook, Queen, King]
   [6-11]:  Black pieces [Pawn, Knight, Bishop, Rook, Queen, King]
   [12]:    Occupied squares (all pieces)
   [13]:    Metadata (castling|ep|halfmove|side packed into single uint64)
-  [14-19]: Reserved for NN features
+  [14]:    Zobrist hash
+  [15-16]: Per-color occupancy (white, black) - maintained incrementally
+  [17-18]: Incremental eval terms (mid/endgame king tables), bias-encoded
+  [19]:    Total non-king material of both sides (game-phase detection)
+  [20-27]: Mailbox - piece_at[64] as int8 bytes (-1 empty, else 0-11),
+           viewed via state[MAILBOX:].view(np.int8)
 
 Move Encoding (uint16):
   Bits 0-5:   from_square (0-63)
@@ -15,11 +20,18 @@ Move Encoding (uint16):
   Bits 12-15: flags (0=normal, 1-4=promotions, 5-6=castling, 7=en passant)
 """
 
+import re
+
 import numpy as np
 from numba import njit
+from numba.core import types, cgutils
+from numba.extending import intrinsic
+from llvmlite import ir
 from typing import Tuple, Optional
 from enum import IntEnum
 
+from engine.psqt import COMBINED_MID_FLAT, COMBINED_END_FLAT, MATERIAL_VALUES
+
 
 # ============================================================================
 # CONSTANTS
@@ -30,6 +42,17 @@ WP, WN, WB, WR, WQ, WK = 0, 1, 2, 3, 4, 5  # White pieces
 BP, BN, BB, BR, BQ, BK = 6, 7, 8, 9, 10, 11  # Black pieces
 OCCUPIED = 12
 META = 13
+WHITE_OCC = 15  # Per-color occupancy, kept current by make/unmake
+BLACK_OCC = 16
+EVAL_MID = 17   # White-perspective eval (middlegame king table)
+EVAL_END = 18   # Same with the endgame king table
+MATERIAL = 19   # Total non-king material, both sides (phase detection)
+MAILBOX = 20    # 8 slots = piece_at[64] int8 mailbox (-1 empty, else 0-11)
+STATE_SIZE = 28  # 224 bytes
+
+# Eval slots hold signed centipawn totals in a uint64: stored as
+# score + EVAL_BIAS so the bit pattern is always a small positive int
+EVAL_BIAS = 1 << 32
 
 # Piece types
 class PieceType(IntEnum):
@@ -72,55 +95,79 @@ A8, B8, C8, D8, E8, F8, G8, H8 = 0, 1, 2, 3, 4, 5, 6, 7
 # BITBOARD UTILITIES (ALL NUMBA - MAXIMUM PERFORMANCE)
 # ============================================================================
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def set_bit(bb: np.uint64, square: int) -> np.uint64:
     """Set bit at square position."""
     return bb | (np.uint64(1) << square)
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def clear_bit(bb: np.uint64, square: int) -> np.uint64:
     """Clear bit at square position."""
     return bb & ~(np.uint64(1) << square)
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def get_bit(bb: np.uint64, square: int) -> bool:
     """Check if bit is set at square."""
     return (bb & (np.uint64(1) << square)) != 0
 
-@njit(cache=True)
+# SWAR popcount masks (64-bit parallel bit count)
+_POP_M1 = np.uint64(0x5555555555555555)
+_POP_M2 = np.uint64(0x3333333333333333)
+_POP_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_POP_H01 = np.uint64(0x0101010101010101)
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def pop_count(bb: np.uint64) -> int:
-    """Count number of set bits (Brian Kernighan's algorithm)."""
-    count = 0
-    while bb:
-        count += 1
-        bb &= bb - np.uint64(1)
-    return count
-
-@njit(cache=True)
+    """
+    Count number of set bits (SWAR parallel popcount).
+
+    Constant time regardless of population - the data-dependent loop of
+    Kernighan's method mispredicts on every exit. LLVM recognizes the
+    pattern and emits a native POPCNT where the target has one.
+    """
+    bb = bb - ((bb >> np.uint64(1)) & _POP_M1)
+    bb = (bb & _POP_M2) + ((bb >> np.uint64(2)) & _POP_M2)
+    bb = (bb + (bb >> np.uint64(4))) & _POP_M4
+    return int((bb * _POP_H01) >> np.uint64(56))
+
+@intrinsic
+def _cttz_u64(typingctx, x):
+    """Trailing-zero count of a uint64 via the llvm.cttz intrinsic -
+    a single TZCNT/CTZ instruction on targets that have one, replacing
+    the De Bruijn multiply-and-table-lookup this used to need."""
+    if x != types.uint64:
+        return None
+    sig = types.int64(types.uint64)
+
+    def codegen(context, builder, signature, args):
+        i64 = ir.IntType(64)
+        fnty = ir.FunctionType(i64, [i64, ir.IntType(1)])
+        fn = cgutils.get_or_insert_function(builder.module, fnty, "llvm.cttz.i64")
+        # Second argument: is_zero_poison=false (callers guard bb == 0)
+        return builder.call(fn, [args[0], ir.Constant(ir.IntType(1), 0)])
+
+    return sig, codegen
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def lsb(bb: np.uint64) -> int:
-    """Get index of least significant bit using De Bruijn multiplication."""
+    """Get index of least significant bit (hardware trailing-zero count)."""
     if bb == 0:
         return -1
-    debruijn = np.uint64(0x03f79d71b4cb0a89)
-    index_table = np.array([
-        0, 47,  1, 56, 48, 27,  2, 60, 57, 49, 41, 37, 28, 16,  3, 61,
-        54, 58, 35, 52, 50, 42, 21, 44, 38, 32, 29, 23, 17, 11,  4, 62,
-        46, 55, 26, 59, 40, 36, 15, 53, 34, 51, 20, 43, 31, 22, 10, 45,
-        25, 39, 14, 33, 19, 30,  9, 24, 13, 18,  8, 12,  7,  6,  5, 63
-    ], dtype=np.int32)
-    return int(index_table[((bb ^ (bb - 1)) * debruijn) >> 58])
+    return _cttz_u64(bb)
 
 
 # ============================================================================
 # SQUARE/COORDINATE UTILITIES
 # ============================================================================
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def square_to_coords(square: int) -> Tuple[int, int]:
     """Convert square index (0-63) to (row, col). Row 0 = rank 8."""
-    return square // 8, square % 8
+    # Shift/mask, not // and %: signed division semantics cost extra
+    # instructions and squares are always non-negative here
+    return square >> 3, square & 7
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def coords_to_square(row: int, col: int) -> int:
     """Convert (row, col) to square index (0-63)."""
     return row * 8 + col
@@ -130,12 +177,16 @@ def coords_to_square(row: int, col: int) -> int:
 # MOVE ENCODING/DECODING
 # ============================================================================
 
-@njit(cache=True, inline='always')
-def encode_move(from_sq: int, to_sq: int, flags: int = 0) -> np.uint16:
-    """Encode move as uint16."""
-    return np.uint16((flags << 12) | (to_sq << 6) | from_sq)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def encode_move(from_sq: int, to_sq: int, flags: int = 0) -> int:
+    """Encode move into the packed uint16 layout.
+
+    Returns a plain int - every caller stores straight into a uint16
+    move buffer, which narrows on assignment, so wrapping the result in
+    np.uint16 here only added a per-move scalar boxing step."""
+    return (flags << 12) | (to_sq << 6) | from_sq
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def decode_move(move: np.uint16) -> Tuple[int, int, int]:
     """Decode move into (from_square, to_square, flags)."""
     from_sq = int(move & 0x3F)
@@ -148,41 +199,47 @@ def decode_move(move: np.uint16) -> Tuple[int, int, int]:
 # METADATA PACKING/UNPACKING
 # ============================================================================
 
-@njit(cache=True, inline='always')
-def pack_metadata(castling: int, ep_square: int, halfmove: int, side: int) -> np.uint64:
-    """Pack metadata: castling(4) | ep(7) | halfmove(9) | side(1)."""
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def pack_metadata(castling: int, ep_square: int, halfmove: int, side: int,
+                  fullmove: int = 1) -> np.uint64:
+    """Pack metadata: castling(4) | ep(7) | halfmove(9) | side(1) | fullmove(15)."""
     ep_encoded = (ep_square + 1) & 0x7F  # Store as +1 so 0 = no EP
     return np.uint64(
-        (castling & 0xF) | 
-        (ep_encoded << 4) | 
-        ((halfmove & 0x1FF) << 11) | 
-        ((side & 0x1) << 20)
+        (castling & 0xF) |
+        (ep_encoded << 4) |
+        ((halfmove & 0x1FF) << 11) |
+        ((side & 0x1) << 20) |
+        ((fullmove & 0x7FFF) << 21)
     )
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def unpack_castling(meta: np.uint64) -> int:
     return int(meta & 0xF)
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def unpack_ep_square(meta: np.uint64) -> int:
     """Returns -1 if no en passant square."""
     ep = int((meta >> 4) & 0x7F)
     return ep - 1
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def unpack_halfmove(meta: np.uint64) -> int:
     return int((meta >> 11) & 0x1FF)
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def unpack_side(meta: np.uint64) -> int:
     return int((meta >> 20) & 0x1)
 
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def unpack_fullmove(meta: np.uint64) -> int:
+    return int((meta >> 21) & 0x7FFF)
+
 
 # ============================================================================
 # ATTACK TABLES (PRE-COMPUTED FOR SPEED)
 # ============================================================================
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def init_knight_attacks():
     """Pre-compute knight attack bitboards."""
     attacks = np.zeros(64, dtype=np.uint64)
@@ -202,7 +259,7 @@ def init_knight_attacks():
         attacks[sq] = bb
     return attacks
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def init_king_attacks():
     """Pre-compute king attack bitboards."""
     attacks = np.zeros(64, dtype=np.uint64)
@@ -222,7 +279,7 @@ def init_king_attacks():
         attacks[sq] = bb
     return attacks
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def init_pawn_attacks():
     """Pre-compute pawn attack bitboards for both colors."""
     attacks = np.zeros((2, 64), dtype=np.uint64)
@@ -253,11 +310,14 @@ PAWN_ATTACKS = init_pawn_attacks()
 
 
 # ============================================================================
-# SLIDING PIECE ATTACKS (VECTORIZED)
+# SLIDING PIECE ATTACKS (MAGIC BITBOARDS)
 # ============================================================================
+# The ray walkers below are only used at import time to build the magic
+# attack tables; runtime lookups go through rook_attacks/bishop_attacks
+# which are a mask, a multiply, a shift and one table load.
 
-@njit(cache=True)
-def rook_attacks(square: int, occupied: np.uint64) -> np.uint64:
+@njit(cache=True, nogil=True, boundscheck=False)
+def _rook_attacks_ray(square: int, occupied: np.uint64) -> np.uint64:
     """Generate rook attacks (classical approach - vectorized loops)."""
     attacks = np.uint64(0)
     row, col = square_to_coords(square)
@@ -292,8 +352,8 @@ def rook_attacks(square: int, occupied: np.uint64) -> np.uint64:
     
     return attacks
 
-@njit(cache=True)
-def bishop_attacks(square: int, occupied: np.uint64) -> np.uint64:
+@njit(cache=True, nogil=True, boundscheck=False)
+def _bishop_attacks_ray(square: int, occupied: np.uint64) -> np.uint64:
     """Generate bishop attacks (classical approach - vectorized loops)."""
     attacks = np.uint64(0)
     row, col = square_to_coords(square)
@@ -340,7 +400,152 @@ def bishop_attacks(square: int, occupied: np.uint64) -> np.uint64:
     
     return attacks
 
-@njit(cache=True, inline='always')
+@njit(cache=True, nogil=True, boundscheck=False)
+def _rook_mask(square: int) -> np.uint64:
+    """Relevant-occupancy mask for a rook: its rays minus the edge
+    squares, whose occupancy never changes the attack set."""
+    mask = np.uint64(0)
+    row, col = square_to_coords(square)
+    for r in range(row - 1, 0, -1):
+        mask = set_bit(mask, coords_to_square(r, col))
+    for r in range(row + 1, 7):
+        mask = set_bit(mask, coords_to_square(r, col))
+    for c in range(col - 1, 0, -1):
+        mask = set_bit(mask, coords_to_square(row, c))
+    for c in range(col + 1, 7):
+        mask = set_bit(mask, coords_to_square(row, c))
+    return mask
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _bishop_mask(square: int) -> np.uint64:
+    """Relevant-occupancy mask for a bishop: its diagonals minus every
+    board-edge square."""
+    mask = np.uint64(0)
+    row, col = square_to_coords(square)
+    for dr in range(-1, 2, 2):
+        for dc in range(-1, 2, 2):
+            r, c = row + dr, col + dc
+            while 0 < r < 7 and 0 < c < 7:
+                mask = set_bit(mask, coords_to_square(r, c))
+                r += dr
+                c += dc
+    return mask
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _fill_magic_square(table: np.ndarray, offset: int, size: int,
+                       magic: np.uint64, shift: np.uint64, mask: np.uint64,
+                       square: int, is_rook: bool) -> bool:
+    """
+    Fill table[offset:offset+size] for one square by enumerating every
+    subset of the relevant-occupancy mask (Carry-Rippler) and indexing
+    with the magic. Returns False on a destructive collision - two
+    subsets mapping to the same slot with different attack sets - in
+    which case the magic is unusable and the region may be left dirty
+    for the next candidate to overwrite.
+    """
+    filled = np.zeros(size, dtype=np.uint8)
+    sub = np.uint64(0)
+    while True:
+        if is_rook:
+            att = _rook_attacks_ray(square, sub)
+        else:
+            att = _bishop_attacks_ray(square, sub)
+        idx = int((sub * magic) >> shift)
+        if filled[idx] == 0:
+            table[offset + idx] = att
+            filled[idx] = 1
+        elif table[offset + idx] != att:
+            return False
+        sub = (sub - mask) & mask
+        if sub == np.uint64(0):
+            return True
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _find_magic(square: int, mask: np.uint64, shift: np.uint64,
+                table: np.ndarray, offset: int, size: int,
+                is_rook: bool, seed: int) -> np.uint64:
+    """Search a working magic for one square with a deterministic
+    xorshift64 stream; candidates are sparse (three draws ANDed)."""
+    s = np.uint64(seed)
+    while True:
+        magic = np.uint64(0xFFFFFFFFFFFFFFFF)
+        for _ in range(3):
+            s ^= s << np.uint64(13)
+            s ^= s >> np.uint64(7)
+            s ^= s << np.uint64(17)
+            magic &= s
+        # Weed out candidates that can't spread the mask's high bits
+        if pop_count((mask * magic) & np.uint64(0xFF00000000000000)) < 6:
+            continue
+        if _fill_magic_square(table, offset, size, magic, shift, mask,
+                              square, is_rook):
+            return magic
+
+
+def _init_magic_tables():
+    """
+    Build the flat magic attack tables at import.
+
+    Starts from the magic constants shipped in engine/tables (generated
+    offline); every constant is verified against the ray walkers while
+    filling its table region, and any that collides under this layout
+    is replaced by a deterministic search. Tables are sized per square
+    (1 << relevant bits), ~800KB for rooks and ~41KB for bishops.
+    """
+    from engine.tables.generation.magic_tables import (
+        get_rook_magics, get_bishop_magics)
+
+    def build(magics, mask_fn, is_rook, seed):
+        masks = np.zeros(64, dtype=np.uint64)
+        shifts = np.zeros(64, dtype=np.uint64)
+        offsets = np.zeros(64, dtype=np.int64)
+        total = 0
+        for sq in range(64):
+            masks[sq] = mask_fn(sq)
+            bits = int(pop_count(masks[sq]))
+            shifts[sq] = np.uint64(64 - bits)
+            offsets[sq] = total
+            total += 1 << bits
+
+        table = np.zeros(total, dtype=np.uint64)
+        for sq in range(64):
+            size = 1 << (64 - int(shifts[sq]))
+            if not _fill_magic_square(table, int(offsets[sq]), size,
+                                      magics[sq], shifts[sq], masks[sq],
+                                      sq, is_rook):
+                magics[sq] = _find_magic(sq, masks[sq], shifts[sq], table,
+                                         int(offsets[sq]), size, is_rook,
+                                         seed + sq)
+        return masks, magics, shifts, offsets, table
+
+    rook = build(get_rook_magics().copy(), _rook_mask, True, 0x9E3779B9)
+    bishop = build(get_bishop_magics().copy(), _bishop_mask, False, 0x85EBCA6B)
+    return rook, bishop
+
+
+(ROOK_MASKS, ROOK_MAGICS, ROOK_SHIFTS, ROOK_OFFSETS, ROOK_ATTACK_TABLE), \
+    (BISHOP_MASKS, BISHOP_MAGICS, BISHOP_SHIFTS, BISHOP_OFFSETS,
+     BISHOP_ATTACK_TABLE) = _init_magic_tables()
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def rook_attacks(square: int, occupied: np.uint64) -> np.uint64:
+    """Rook attacks via magic lookup: mask, multiply, shift, one load."""
+    idx = ((occupied & ROOK_MASKS[square]) * ROOK_MAGICS[square]) >> ROOK_SHIFTS[square]
+    return ROOK_ATTACK_TABLE[ROOK_OFFSETS[square] + int(idx)]
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def bishop_attacks(square: int, occupied: np.uint64) -> np.uint64:
+    """Bishop attacks via magic lookup: mask, multiply, shift, one load."""
+    idx = ((occupied & BISHOP_MASKS[square]) * BISHOP_MAGICS[square]) >> BISHOP_SHIFTS[square]
+    return BISHOP_ATTACK_TABLE[BISHOP_OFFSETS[square] + int(idx)]
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def queen_attacks(square: int, occupied: np.uint64) -> np.uint64:
     """Queen attacks = rook + bishop."""
     return rook_attacks(square, occupied) | bishop_attacks(square, occupied)
@@ -350,10 +555,10 @@ def queen_attacks(square: int, occupied: np.uint64) -> np.uint64:
 # STATE INITIALIZATION
 # ============================================================================
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def create_initial_state() -> np.ndarray:
     """Create starting position state."""
-    state = np.zeros(20, dtype=np.uint64)
+    state = np.zeros(STATE_SIZE, dtype=np.uint64)
     
     # White pieces (rank 1-2, squares 48-63)
     state[WP] = np.uint64(0x00FF000000000000)  # Pawns on rank 2 (squares 48-55)
@@ -371,18 +576,22 @@ def create_initial_state() -> np.ndarray:
     state[BQ] = np.uint64(0x0000000000000008)  # Queen d8 (square 3)
     state[BK] = np.uint64(0x0000000000000010)  # King e8 (square 4)
     
-    # Occupied
+    # Occupancy (total and per color)
     state[OCCUPIED] = np.uint64(0xFFFF00000000FFFF)
+    state[WHITE_OCC] = np.uint64(0xFFFF000000000000)
+    state[BLACK_OCC] = np.uint64(0x000000000000FFFF)
     
     # Metadata: all castling, no ep, halfmove=0, white to move
-    state[META] = pack_metadata(CASTLE_ALL, -1, 0, Color.WHITE)
+    # (0 = Color.WHITE frozen as a literal so numba constant-folds it)
+    state[META] = pack_metadata(CASTLE_ALL, -1, 0, 0)
     
-    # Compute Zobrist hash
+    # Compute Zobrist hash and seed the incremental eval terms
     state[HASH] = compute_zobrist_hash(state)
-    
+    compute_eval_terms(state)
+
     return state
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def copy_state(state: np.ndarray) -> np.ndarray:
     """Fast state copy."""
     return state.copy()
@@ -392,148 +601,243 @@ def copy_state(state: np.ndarray) -> np.ndarray:
 # PIECE LOOKUP
 # ============================================================================
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def get_piece_at(state: np.ndarray, square: int) -> Tuple[int, int]:
     """
     Get (piece_type, color) at square.
     Returns (PieceType.EMPTY, -1) if empty.
+
+    One byte load from the mailbox (kept current by make/unmake) instead
+    of scanning up to twelve bitboards.
+    """
+    piece_idx = state[MAILBOX:].view(np.int8)[square]
+    if piece_idx < 0:
+        return -1, -1
+    if piece_idx >= 6:
+        return piece_idx - 6, 1
+    return piece_idx, 0
+
+
+# ============================================================================
+# INCREMENTAL EVALUATION TERMS
+# ============================================================================
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def compute_eval_terms(state: np.ndarray):
     """
-    for piece_idx in range(6):
-        if get_bit(state[piece_idx], square):  # White piece
-            return piece_idx, 0
-        if get_bit(state[piece_idx + 6], square):  # Black piece
-            return piece_idx, 1
-    return -1, -1  # Empty
+    Fill the EVAL_MID / EVAL_END slots from scratch.
+
+    Used when a position is built whole (initial setup, FEN parsing);
+    make/unmake keep the slots current per move afterwards. Scores are
+    white-perspective sums of the COMBINED tensors (material + PSQT),
+    stored bias-encoded so the signed totals live in uint64 slots.
+
+    The same piece sweep also seeds the mailbox slots, so one pass
+    builds every derived term the incremental updates maintain.
+    """
+    mailbox = state[MAILBOX:].view(np.int8)
+    mailbox[:] = -1
+    mid = 0
+    end = 0
+    material = 0
+    for piece_idx in range(12):
+        bb = state[piece_idx]
+        value = int(MATERIAL_VALUES[piece_idx])  # 0 for kings
+        while bb:
+            sq = lsb(bb)
+            bb = clear_bit(bb, sq)
+            mid += int(COMBINED_MID_FLAT[piece_idx * 64 + sq])
+            end += int(COMBINED_END_FLAT[piece_idx * 64 + sq])
+            material += value
+            mailbox[sq] = piece_idx
+    state[EVAL_MID] = np.uint64(mid + EVAL_BIAS)
+    state[EVAL_END] = np.uint64(end + EVAL_BIAS)
+    state[MATERIAL] = np.uint64(material)
 
 
 # ============================================================================
 # MAKE/UNMAKE MOVE (ALL NUMBA - CORE PERFORMANCE)
 # ============================================================================
 
-@njit(cache=True)
-def make_move_numba(state: np.ndarray, move: np.uint16) -> np.ndarray:
+# Promotion flag -> piece type (index 0 unused; flags 1-4 = Q, R, B, N).
+# Module-level so numba freezes it as a read-only constant instead of
+# allocating a fresh array inside the make/unmake kernels.
+_PROMO_PIECES = np.array([0, 4, 3, 2, 1], dtype=np.int8)
+
+# Undo record width, shared by every caller that allocates an undo slot
+# (Board's ply stack, the legality filter's scratch buffer). A buffer
+# narrower than this means out-of-bounds writes under boundscheck=False.
+UNDO_RECORD_WIDTH = 8  # [meta, cap_type, cap_color, hash, piece_idx, eval_mid, eval_end, material]
+
+
+def _init_castle_mask() -> np.ndarray:
+    """Per-square castling-rights mask: ANDing the masks for from_sq and
+    to_sq clears exactly the rights lost by touching (moving from or
+    capturing on) each king/rook home square - no branches needed."""
+    mask = np.full(64, CASTLE_ALL, dtype=np.uint8)
+    mask[A8] = CASTLE_ALL ^ CASTLE_BQ
+    mask[E8] = CASTLE_ALL ^ (CASTLE_BK | CASTLE_BQ)
+    mask[H8] = CASTLE_ALL ^ CASTLE_BK
+    mask[A1] = CASTLE_ALL ^ CASTLE_WQ
+    mask[E1] = CASTLE_ALL ^ (CASTLE_WK | CASTLE_WQ)
+    mask[H1] = CASTLE_ALL ^ CASTLE_WK
+    return mask
+
+CASTLE_MASK = _init_castle_mask()
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def make_move_numba(state: np.ndarray, move: np.uint16, undo_info: np.ndarray):
     """
-    Execute move on state. Returns undo_info for unmake.
-    Undo format: [old_meta, captured_piece_type, captured_color, old_fullmove]
+    Execute move on state, writing undo data into the caller's buffer.
+    Undo format: [old_meta, captured_piece_type, captured_color, old_hash,
+    moving_piece_idx, old_eval_mid, old_eval_end, old_material]
+
+    undo_info is a preallocated int64[8] slot (e.g. one row of a ply-indexed
+    undo stack) so the hot path never allocates. The moving piece index is
+    recorded so unmake does not have to re-scan the bitboards for it, and
+    the eval terms are snapshotted so unmake restores them with two stores.
     """
     from_sq, to_sq, flags = decode_move(move)
     piece_type, color = get_piece_at(state, from_sq)
-    
-    # Save undo info (including old hash)
-    undo_info = np.array([
-        state[META],  # Old metadata
-        -1,  # Captured piece type
-        -1,  # Captured color
-        state[HASH]  # Old hash
-    ], dtype=np.int64)
+
+    # Save undo info (including old hash and eval terms)
+    undo_info[0] = state[META]   # Old metadata
+    undo_info[1] = -1            # Captured piece type
+    undo_info[2] = -1            # Captured color
+    undo_info[3] = state[HASH]   # Old hash
+    undo_info[5] = np.int64(state[EVAL_MID])
+    undo_info[6] = np.int64(state[EVAL_END])
+    undo_info[7] = np.int64(state[MATERIAL])
+
+    # Eval/material deltas for the <=4 squares this move touches;
+    # applied at the end so the slots see one read-modify-write each
+    d_mid = 0
+    d_end = 0
+    d_mat = 0
+
+    # Mailbox bytes updated alongside the bitboards (captures need no
+    # explicit clear - the mover's byte overwrites the victim's)
+    mailbox = state[MAILBOX:].view(np.int8)
     
     # Start with current hash
     hash_val = np.uint64(state[HASH])
     
-    # Get piece bitboard index
+    # Get piece bitboard index (and the occupancy slots to maintain)
     piece_idx = piece_type if color == 0 else piece_type + 6
-    
-    # Handle captures
-    cap_type, cap_color = get_piece_at(state, to_sq)
-    if cap_type >= 0:
+    undo_info[4] = piece_idx     # Moving piece (reused by unmake)
+    own_occ = WHITE_OCC if color == 0 else BLACK_OCC
+    opp_occ = BLACK_OCC if color == 0 else WHITE_OCC
+
+    # Handle captures. Only the opponent can occupy to_sq, so one test of
+    # their occupancy settles the quiet-move case and a capture scans just
+    # their six boards instead of all twelve.
+    cap_type = -1
+    if get_bit(state[opp_occ], to_sq):
+        opp_base = 6 if color == 0 else 0
+        for pt in range(6):
+            if get_bit(state[opp_base + pt], to_sq):
+                cap_type = pt
+                break
         undo_info[1] = cap_type
-        undo_info[2] = cap_color
-        cap_idx = cap_type if cap_color == 0 else cap_type + 6
+        undo_info[2] = 1 - color
+        cap_idx = opp_base + cap_type
         state[cap_idx] = clear_bit(state[cap_idx], to_sq)
+        state[opp_occ] = clear_bit(state[opp_occ], to_sq)
+        d_mid -= int(COMBINED_MID_FLAT[cap_idx * 64 + to_sq])
+        d_end -= int(COMBINED_END_FLAT[cap_idx * 64 + to_sq])
+        d_mat -= int(MATERIAL_VALUES[cap_idx])
         # Update hash: remove captured piece
         hash_val = update_hash_piece_remove(hash_val, cap_idx, to_sq)
     
-    # Get current metadata
-    castling = unpack_castling(state[META])
-    ep_square = unpack_ep_square(state[META])
-    halfmove = unpack_halfmove(state[META])
-    side = unpack_side(state[META])
-    
-    # Handle special moves
-    if flags == FLAG_CASTLING_KINGSIDE:
-        # King
+    # Get current metadata - one load of the packed word, then register
+    # shifts for the individual fields
+    meta = state[META]
+    castling = unpack_castling(meta)
+    ep_square = unpack_ep_square(meta)
+    halfmove = unpack_halfmove(meta)
+    side = unpack_side(meta)
+    fullmove = unpack_fullmove(meta)
+    
+    # Apply the move, specialized by flag. Every non-promotion move shares
+    # the relocate-moving-piece prologue, so normal moves (the vast
+    # majority) take a single flag test and fall straight through.
+    if flags < FLAG_PROMOTION_QUEEN or flags > FLAG_PROMOTION_KNIGHT:
         state[piece_idx] = clear_bit(state[piece_idx], from_sq)
         state[piece_idx] = set_bit(state[piece_idx], to_sq)
+        mailbox[from_sq] = -1
+        mailbox[to_sq] = piece_idx
+        d_mid += int(COMBINED_MID_FLAT[piece_idx * 64 + to_sq]) - int(COMBINED_MID_FLAT[piece_idx * 64 + from_sq])
+        d_end += int(COMBINED_END_FLAT[piece_idx * 64 + to_sq]) - int(COMBINED_END_FLAT[piece_idx * 64 + from_sq])
         hash_val = update_hash_piece_move(hash_val, piece_idx, from_sq, to_sq)
-        # Rook
-        rook_idx = WR if color == 0 else BR
-        rook_from = H1 if color == 0 else H8
-        rook_to = F1 if color == 0 else F8
-        state[rook_idx] = clear_bit(state[rook_idx], rook_from)
-        state[rook_idx] = set_bit(state[rook_idx], rook_to)
-        hash_val = update_hash_piece_move(hash_val, rook_idx, rook_from, rook_to)
-    
-    elif flags == FLAG_CASTLING_QUEENSIDE:
-        # King
-        state[piece_idx] = clear_bit(state[piece_idx], from_sq)
-        state[piece_idx] = set_bit(state[piece_idx], to_sq)
-        hash_val = update_hash_piece_move(hash_val, piece_idx, from_sq, to_sq)
-        # Rook
-        rook_idx = WR if color == 0 else BR
-        rook_from = A1 if color == 0 else A8
-        rook_to = D1 if color == 0 else D8
-        state[rook_idx] = clear_bit(state[rook_idx], rook_from)
-        state[rook_idx] = set_bit(state[rook_idx], rook_to)
-        hash_val = update_hash_piece_move(hash_val, rook_idx, rook_from, rook_to)
-    
-    elif flags == FLAG_EN_PASSANT:
-        # Move pawn
-        state[piece_idx] = clear_bit(state[piece_idx], from_sq)
-        state[piece_idx] = set_bit(state[piece_idx], to_sq)
-        hash_val = update_hash_piece_move(hash_val, piece_idx, from_sq, to_sq)
-        # Capture en passant pawn
-        ep_capture_sq = ep_square + 8 if color == 0 else ep_square - 8
-        ep_pawn_idx = BP if color == 0 else WP
-        state[ep_pawn_idx] = clear_bit(state[ep_pawn_idx], ep_capture_sq)
-        hash_val = update_hash_piece_remove(hash_val, ep_pawn_idx, ep_capture_sq)
-        # NOTE: Don't set undo_info for captured piece - EP unmake handles it specially
-        # undo_info[1] and undo_info[2] stay at -1
-    
-    elif FLAG_PROMOTION_QUEEN <= flags <= FLAG_PROMOTION_KNIGHT:
+
+        if flags == FLAG_CASTLING_KINGSIDE:
+            rook_idx = WR if color == 0 else BR
+            rook_from = H1 if color == 0 else H8
+            rook_to = F1 if color == 0 else F8
+            state[rook_idx] = clear_bit(state[rook_idx], rook_from)
+            state[rook_idx] = set_bit(state[rook_idx], rook_to)
+            mailbox[rook_from] = -1
+            mailbox[rook_to] = rook_idx
+            state[own_occ] = clear_bit(state[own_occ], rook_from)
+            state[own_occ] = set_bit(state[own_occ], rook_to)
+            d_mid += int(COMBINED_MID_FLAT[rook_idx * 64 + rook_to]) - int(COMBINED_MID_FLAT[rook_idx * 64 + rook_from])
+            d_end += int(COMBINED_END_FLAT[rook_idx * 64 + rook_to]) - int(COMBINED_END_FLAT[rook_idx * 64 + rook_from])
+            hash_val = update_hash_piece_move(hash_val, rook_idx, rook_from, rook_to)
+
+        elif flags == FLAG_CASTLING_QUEENSIDE:
+            rook_idx = WR if color == 0 else BR
+            rook_from = A1 if color == 0 else A8
+            rook_to = D1 if color == 0 else D8
+            state[rook_idx] = clear_bit(state[rook_idx], rook_from)
+            state[rook_idx] = set_bit(state[rook_idx], rook_to)
+            mailbox[rook_from] = -1
+            mailbox[rook_to] = rook_idx
+            state[own_occ] = clear_bit(state[own_occ], rook_from)
+            state[own_occ] = set_bit(state[own_occ], rook_to)
+            d_mid += int(COMBINED_MID_FLAT[rook_idx * 64 + rook_to]) - int(COMBINED_MID_FLAT[rook_idx * 64 + rook_from])
+            d_end += int(COMBINED_END_FLAT[rook_idx * 64 + rook_to]) - int(COMBINED_END_FLAT[rook_idx * 64 + rook_from])
+            hash_val = update_hash_piece_move(hash_val, rook_idx, rook_from, rook_to)
+
+        elif flags == FLAG_EN_PASSANT:
+            # Capture en passant pawn
+            ep_capture_sq = ep_square + 8 if color == 0 else ep_square - 8
+            ep_pawn_idx = BP if color == 0 else WP
+            state[ep_pawn_idx] = clear_bit(state[ep_pawn_idx], ep_capture_sq)
+            mailbox[ep_capture_sq] = -1
+            state[opp_occ] = clear_bit(state[opp_occ], ep_capture_sq)
+            d_mid -= int(COMBINED_MID_FLAT[ep_pawn_idx * 64 + ep_capture_sq])
+            d_end -= int(COMBINED_END_FLAT[ep_pawn_idx * 64 + ep_capture_sq])
+            d_mat -= int(MATERIAL_VALUES[ep_pawn_idx])
+            hash_val = update_hash_piece_remove(hash_val, ep_pawn_idx, ep_capture_sq)
+            # NOTE: Don't set undo_info for captured piece - EP unmake handles it specially
+            # undo_info[1] and undo_info[2] stay at -1
+
+    else:  # Promotion
         # Remove pawn
         state[piece_idx] = clear_bit(state[piece_idx], from_sq)
+        d_mid -= int(COMBINED_MID_FLAT[piece_idx * 64 + from_sq])
+        d_end -= int(COMBINED_END_FLAT[piece_idx * 64 + from_sq])
         hash_val = update_hash_piece_remove(hash_val, piece_idx, from_sq)
         # Add promoted piece
-        promo_types = np.array([0, 4, 3, 2, 1], dtype=np.int8)  # Q, R, B, N
-        promo_piece = promo_types[flags]
+        promo_piece = _PROMO_PIECES[flags]
         promo_idx = promo_piece if color == 0 else promo_piece + 6
         state[promo_idx] = set_bit(state[promo_idx], to_sq)
+        mailbox[from_sq] = -1
+        mailbox[to_sq] = promo_idx
+        d_mid += int(COMBINED_MID_FLAT[promo_idx * 64 + to_sq])
+        d_end += int(COMBINED_END_FLAT[promo_idx * 64 + to_sq])
+        d_mat += int(MATERIAL_VALUES[promo_idx]) - int(MATERIAL_VALUES[piece_idx])
         hash_val = update_hash_piece_add(hash_val, promo_idx, to_sq)
-    
-    else:  # Normal move
-        state[piece_idx] = clear_bit(state[piece_idx], from_sq)
-        state[piece_idx] = set_bit(state[piece_idx], to_sq)
-        hash_val = update_hash_piece_move(hash_val, piece_idx, from_sq, to_sq)
-    
-    # Update castling rights
-    if piece_type == 5:  # King
-        if color == 0:
-            castling &= ~(CASTLE_WK | CASTLE_WQ)
-        else:
-            castling &= ~(CASTLE_BK | CASTLE_BQ)
-    elif piece_type == 3:  # Rook
-        if color == 0:
-            if from_sq == A1:
-                castling &= ~CASTLE_WQ
-            elif from_sq == H1:
-                castling &= ~CASTLE_WK
-        else:
-            if from_sq == A8:
-                castling &= ~CASTLE_BQ
-            elif from_sq == H8:
-                castling &= ~CASTLE_BK
-    
-    # Rook captured
-    if cap_type == 3:
-        if to_sq == A1:
-            castling &= ~CASTLE_WQ
-        elif to_sq == H1:
-            castling &= ~CASTLE_WK
-        elif to_sq == A8:
-            castling &= ~CASTLE_BQ
-        elif to_sq == H8:
-            castling &= ~CASTLE_BK
-    
+
+    # Moving side vacates from_sq and lands on to_sq in every case
+    state[own_occ] = clear_bit(state[own_occ], from_sq)
+    state[own_occ] = set_bit(state[own_occ], to_sq)
+
+    # Update castling rights: two table loads and two ANDs cover king
+    # moves, rook moves and rook captures without any branches
+    castling &= int(CASTLE_MASK[from_sq]) & int(CASTLE_MASK[to_sq])
+
+
     # Update en passant
     new_ep = -1
     if piece_type == 0:  # Pawn
@@ -546,28 +850,30 @@ def make_move_numba(state: np.ndarray, move: np.uint16) -> np.ndarray:
     else:
         halfmove += 1
     
-    # Update occupied bitboard
-    state[OCCUPIED] = np.uint64(0)
-    for i in range(12):
-        state[OCCUPIED] |= state[i]
+    # Total occupancy is just the union of the two color boards
+    state[OCCUPIED] = state[WHITE_OCC] | state[BLACK_OCC]
+
+    # Apply the accumulated eval deltas (bias keeps the slots positive)
+    state[EVAL_MID] = np.uint64(np.int64(state[EVAL_MID]) + d_mid)
+    state[EVAL_END] = np.uint64(np.int64(state[EVAL_END]) + d_end)
+    state[MATERIAL] = np.uint64(np.int64(state[MATERIAL]) + d_mat)
     
-    # Pack new metadata
+    # Pack new metadata (fullmove advances after black's move)
     new_side = 1 - side
-    state[META] = pack_metadata(castling, new_ep, halfmove, new_side)
-    
-    # Update hash for metadata changes
-    old_castling = unpack_castling(undo_info[0])
-    old_ep = unpack_ep_square(undo_info[0])
-    hash_val = update_hash_castling(hash_val, old_castling, castling)
-    hash_val = update_hash_ep(hash_val, old_ep, new_ep)
+    if side == 1:
+        fullmove += 1
+    state[META] = pack_metadata(castling, new_ep, halfmove, new_side, fullmove)
+    
+    # Update hash for metadata changes (old values come from the meta
+    # word already in a register, not from re-reading the undo record)
+    hash_val = update_hash_castling(hash_val, unpack_castling(meta), castling)
+    hash_val = update_hash_ep(hash_val, ep_square, new_ep)
     hash_val = update_hash_side(hash_val)  # Flip side
     
     # Store updated hash
     state[HASH] = hash_val
-    
-    return undo_info
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def unmake_move_numba(state: np.ndarray, move: np.uint16, undo_info: np.ndarray):
     """Undo a move using undo_info."""
     from_sq, to_sq, flags = decode_move(move)
@@ -578,112 +884,121 @@ def unmake_move_numba(state: np.ndarray, move: np.uint16, undo_info: np.ndarray)
     
     # Restore metadata AFTER we get moving_side
     state[META] = np.uint64(undo_info[0])
-    
-    # Determine piece type
-    if flags == FLAG_CASTLING_KINGSIDE or flags == FLAG_CASTLING_QUEENSIDE:
-        piece_type = 5  # King
-    elif flags >= FLAG_PROMOTION_QUEEN:
-        piece_type = 0  # Was a pawn before promotion
-    else:
-        piece_type, _ = get_piece_at(state, to_sq)
-    
-    piece_idx = piece_type if moving_side == 0 else piece_type + 6
-    
-    # Handle special moves
-    if flags == FLAG_CASTLING_KINGSIDE:
-        # King
-        state[piece_idx] = clear_bit(state[piece_idx], to_sq)
-        state[piece_idx] = set_bit(state[piece_idx], from_sq)
-        # Rook
-        rook_idx = WR if moving_side == 0 else BR
-        rook_from = H1 if moving_side == 0 else H8
-        rook_to = F1 if moving_side == 0 else F8
-        state[rook_idx] = clear_bit(state[rook_idx], rook_to)
-        state[rook_idx] = set_bit(state[rook_idx], rook_from)
-    
-    elif flags == FLAG_CASTLING_QUEENSIDE:
-        # King
-        state[piece_idx] = clear_bit(state[piece_idx], to_sq)
-        state[piece_idx] = set_bit(state[piece_idx], from_sq)
-        # Rook
-        rook_idx = WR if moving_side == 0 else BR
-        rook_from = A1 if moving_side == 0 else A8
-        rook_to = D1 if moving_side == 0 else D8
-        state[rook_idx] = clear_bit(state[rook_idx], rook_to)
-        state[rook_idx] = set_bit(state[rook_idx], rook_from)
-    
-    elif flags == FLAG_EN_PASSANT:
-        # Move pawn back
+
+    # Moving piece was recorded by make_move - no bitboard scan needed
+    piece_idx = int(undo_info[4])
+    own_occ = WHITE_OCC if moving_side == 0 else BLACK_OCC
+    opp_occ = BLACK_OCC if moving_side == 0 else WHITE_OCC
+    mailbox = state[MAILBOX:].view(np.int8)
+
+    # Undo the move, specialized by flag (mirror of make_move_numba):
+    # every non-promotion move shares the relocate-back prologue.
+    if flags < FLAG_PROMOTION_QUEEN or flags > FLAG_PROMOTION_KNIGHT:
         state[piece_idx] = clear_bit(state[piece_idx], to_sq)
         state[piece_idx] = set_bit(state[piece_idx], from_sq)
-        # Restore captured pawn
-        # NOTE: Must calculate from to_sq, not from ep_square in metadata (already restored to old value)
-        ep_capture_sq = to_sq + 8 if moving_side == 0 else to_sq - 8
-        ep_pawn_idx = BP if moving_side == 0 else WP
-        state[ep_pawn_idx] = set_bit(state[ep_pawn_idx], ep_capture_sq)
-    
-    elif FLAG_PROMOTION_QUEEN <= flags <= FLAG_PROMOTION_KNIGHT:
+        mailbox[to_sq] = -1  # Overwritten below if a capture is restored
+        mailbox[from_sq] = piece_idx
+
+        if flags == FLAG_CASTLING_KINGSIDE:
+            rook_idx = WR if moving_side == 0 else BR
+            rook_from = H1 if moving_side == 0 else H8
+            rook_to = F1 if moving_side == 0 else F8
+            state[rook_idx] = clear_bit(state[rook_idx], rook_to)
+            state[rook_idx] = set_bit(state[rook_idx], rook_from)
+            mailbox[rook_to] = -1
+            mailbox[rook_from] = rook_idx
+            state[own_occ] = clear_bit(state[own_occ], rook_to)
+            state[own_occ] = set_bit(state[own_occ], rook_from)
+
+        elif flags == FLAG_CASTLING_QUEENSIDE:
+            rook_idx = WR if moving_side == 0 else BR
+            rook_from = A1 if moving_side == 0 else A8
+            rook_to = D1 if moving_side == 0 else D8
+            state[rook_idx] = clear_bit(state[rook_idx], rook_to)
+            state[rook_idx] = set_bit(state[rook_idx], rook_from)
+            mailbox[rook_to] = -1
+            mailbox[rook_from] = rook_idx
+            state[own_occ] = clear_bit(state[own_occ], rook_to)
+            state[own_occ] = set_bit(state[own_occ], rook_from)
+
+        elif flags == FLAG_EN_PASSANT:
+            # Restore captured pawn
+            # NOTE: Must calculate from to_sq, not from ep_square in metadata (already restored to old value)
+            ep_capture_sq = to_sq + 8 if moving_side == 0 else to_sq - 8
+            ep_pawn_idx = BP if moving_side == 0 else WP
+            state[ep_pawn_idx] = set_bit(state[ep_pawn_idx], ep_capture_sq)
+            mailbox[ep_capture_sq] = ep_pawn_idx
+            state[opp_occ] = set_bit(state[opp_occ], ep_capture_sq)
+
+    else:  # Promotion
         # Remove promoted piece
-        promo_types = np.array([0, 4, 3, 2, 1], dtype=np.int8)
-        promo_piece = promo_types[flags]
+        promo_piece = _PROMO_PIECES[flags]
         promo_idx = promo_piece if moving_side == 0 else promo_piece + 6
         state[promo_idx] = clear_bit(state[promo_idx], to_sq)
         # Restore pawn
         pawn_idx = WP if moving_side == 0 else BP
         state[pawn_idx] = set_bit(state[pawn_idx], from_sq)
-    
-    else:  # Normal move
-        state[piece_idx] = clear_bit(state[piece_idx], to_sq)
-        state[piece_idx] = set_bit(state[piece_idx], from_sq)
-    
+        mailbox[to_sq] = -1  # Overwritten below if a capture is restored
+        mailbox[from_sq] = pawn_idx
+
+    # Moving side returns from to_sq to from_sq in every case
+    state[own_occ] = clear_bit(state[own_occ], to_sq)
+    state[own_occ] = set_bit(state[own_occ], from_sq)
+
     # Restore captured piece
     cap_type = int(undo_info[1])
     cap_color = int(undo_info[2])
     if cap_type >= 0:
         cap_idx = cap_type if cap_color == 0 else cap_type + 6
         state[cap_idx] = set_bit(state[cap_idx], to_sq)
+        mailbox[to_sq] = cap_idx
+        state[opp_occ] = set_bit(state[opp_occ], to_sq)
     
     # Update occupied
-    state[OCCUPIED] = np.uint64(0)
-    for i in range(12):
-        state[OCCUPIED] |= state[i]
-    
-    # Restore hash from undo_info
+    state[OCCUPIED] = state[WHITE_OCC] | state[BLACK_OCC]
+
+    # Restore hash and eval terms from undo_info
     state[HASH] = np.uint64(undo_info[3])
+    state[EVAL_MID] = np.uint64(undo_info[5])
+    state[EVAL_END] = np.uint64(undo_info[6])
+    state[MATERIAL] = np.uint64(undo_info[7])
 
 
 # ============================================================================
 # FEN CONVERSION (NUMBA WHERE POSSIBLE)
 # ============================================================================
 
-def to_fen(state: np.ndarray, fullmove: int) -> str:
-    """Convert state to FEN string."""
-    pieces = {
-        0: ('P', 'p'), 1: ('N', 'n'), 2: ('B', 'b'),
-        3: ('R', 'r'), 4: ('Q', 'q'), 5: ('K', 'k')
-    }
-    
-    # Piece placement
-    fen_parts = []
-    for row in range(8):
-        empty = 0
-        row_str = ""
-        for col in range(8):
-            sq = coords_to_square(row, col)
-            piece_type, color = get_piece_at(state, sq)
-            if piece_type < 0:
-                empty += 1
-            else:
-                if empty > 0:
-                    row_str += str(empty)
-                    empty = 0
-                row_str += pieces[piece_type][color]
-        if empty > 0:
-            row_str += str(empty)
-        fen_parts.append(row_str)
-    
-    fen = "/".join(fen_parts)
-    
+# Interned piece glyphs, built once: piece_type -> (white_char, black_char)
+# and the reverse FEN char -> (piece_type, color) map.
+PIECE_CHARS = {
+    0: ('P', 'p'), 1: ('N', 'n'), 2: ('B', 'b'),
+    3: ('R', 'r'), 4: ('Q', 'q'), 5: ('K', 'k')
+}
+FEN_PIECE_MAP = {
+    'P': (0, 0), 'p': (0, 1), 'N': (1, 0), 'n': (1, 1),
+    'B': (2, 0), 'b': (2, 1), 'R': (3, 0), 'r': (3, 1),
+    'Q': (4, 0), 'q': (4, 1), 'K': (5, 0), 'k': (5, 1)
+}
+
+# Vectorized FEN support: per-bitboard glyph and a 0-63 shift vector
+_FEN_CHARS = np.array(list('PNBRQKpnbrqk'), dtype='<U1')
+_SQUARE_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+def to_fen(state: np.ndarray) -> str:
+    """Convert state to FEN string (clocks included - all state is in the vector)."""
+    # Piece placement - expand each bitboard to a 64-char array in one
+    # vectorized pass instead of 64 per-square lookups
+    board_chars = np.full(64, '.', dtype='<U1')
+    for piece_idx in range(12):
+        mask = (state[piece_idx] >> _SQUARE_SHIFTS) & np.uint64(1)
+        board_chars[mask.astype(np.bool_)] = _FEN_CHARS[piece_idx]
+
+    rows = (''.join(board_chars[row * 8:row * 8 + 8]) for row in range(8))
+    fen = "/".join(
+        re.sub(r'\.+', lambda m: str(len(m.group())), row_str) for row_str in rows
+    )
+
     # Side to move
     side = unpack_side(state[META])
     fen += " w" if side == 0 else " b"
@@ -711,24 +1026,21 @@ def to_fen(state: np.ndarray, fullmove: int) -> str:
     
     # Clocks
     halfmove = unpack_halfmove(state[META])
+    fullmove = unpack_fullmove(state[META])
     fen += f" {halfmove} {fullmove}"
     
     return fen
 
-def from_fen(fen: str) -> Tuple[np.ndarray, int]:
-    """Parse FEN and return (state, fullmove)."""
+def from_fen(fen: str) -> np.ndarray:
+    """Parse FEN into a complete state vector (clocks packed into META)."""
     parts = fen.split()
     if len(parts) != 6:
         raise ValueError(f"Invalid FEN: expected 6 parts, got {len(parts)}")
     
-    state = np.zeros(20, dtype=np.uint64)
-    
-    piece_map = {
-        'P': (0, 0), 'p': (0, 1), 'N': (1, 0), 'n': (1, 1),
-        'B': (2, 0), 'b': (2, 1), 'R': (3, 0), 'r': (3, 1),
-        'Q': (4, 0), 'q': (4, 1), 'K': (5, 0), 'k': (5, 1)
-    }
-    
+    state = np.zeros(STATE_SIZE, dtype=np.uint64)
+
+    piece_map = FEN_PIECE_MAP
+
     # Parse pieces
     rows = parts[0].split('/')
     for row_idx, row_str in enumerate(rows):
@@ -769,16 +1081,19 @@ def from_fen(fen: str) -> Tuple[np.ndarray, int]:
     fullmove = int(parts[5])
     
     # Pack metadata
-    state[META] = pack_metadata(castling, ep, halfmove, side)
+    state[META] = pack_metadata(castling, ep, halfmove, side, fullmove)
     
-    # Update occupied
-    for i in range(12):
-        state[OCCUPIED] |= state[i]
+    # Update occupancy (per color, then total)
+    for i in range(6):
+        state[WHITE_OCC] |= state[WP + i]
+        state[BLACK_OCC] |= state[BP + i]
+    state[OCCUPIED] = state[WHITE_OCC] | state[BLACK_OCC]
     
-    # Compute Zobrist hash
+    # Compute Zobrist hash and seed the incremental eval terms
     state[HASH] = compute_zobrist_hash(state)
-    
-    return state, fullmove
+    compute_eval_terms(state)
+
+    return state
 
 
 # ============================================================================
@@ -814,11 +1129,15 @@ def _init_zobrist_keys():
 # Global Zobrist keys (initialized once at module load)
 ZOBRIST_PIECES, ZOBRIST_CASTLING, ZOBRIST_EP, ZOBRIST_SIDE = _init_zobrist_keys()
 
+# Flat (768,) view of the piece keys: hashing indexes piece_idx * 64 + sq
+# with a single load instead of a two-level (12, 64) lookup
+ZOBRIST_PIECES_FLAT = np.ascontiguousarray(ZOBRIST_PIECES.reshape(-1))
+
 # Add HASH constant for state array index
 HASH = 14  # Store hash at index 14 (reserved slot)
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def compute_zobrist_hash(state: np.ndarray) -> np.uint64:
     """
     Compute Zobrist hash from scratch.
@@ -826,13 +1145,14 @@ def compute_zobrist_hash(state: np.ndarray) -> np.uint64:
     """
     hash_val = np.uint64(0)
     
-    # XOR each piece on the board
+    # XOR each piece on the board (Kernighan loop over occupied squares only)
     for piece_idx in range(12):
         pieces = state[piece_idx]
+        base = piece_idx * 64
         while pieces:
             sq = lsb(pieces)
             pieces = clear_bit(pieces, sq)
-            hash_val ^= ZOBRIST_PIECES[piece_idx][sq]
+            hash_val ^= ZOBRIST_PIECES_FLAT[base + sq]
     
     # XOR castling rights (use full 4-bit value as index)
     castling = unpack_castling(state[META])
@@ -852,29 +1172,30 @@ def compute_zobrist_hash(state: np.ndarray) -> np.uint64:
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_piece_move(hash_val: np.uint64, piece_idx: int, from_sq: int, to_sq: int) -> np.uint64:
     """Update hash for a piece moving from one square to another."""
-    hash_val ^= ZOBRIST_PIECES[piece_idx][from_sq]  # Remove from old square
-    hash_val ^= ZOBRIST_PIECES[piece_idx][to_sq]    # Add to new square
+    base = piece_idx * 64
+    hash_val ^= ZOBRIST_PIECES_FLAT[base + from_sq]  # Remove from old square
+    hash_val ^= ZOBRIST_PIECES_FLAT[base + to_sq]    # Add to new square
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_piece_add(hash_val: np.uint64, piece_idx: int, sq: int) -> np.uint64:
     """Update hash for adding a piece."""
-    hash_val ^= ZOBRIST_PIECES[piece_idx][sq]
+    hash_val ^= ZOBRIST_PIECES_FLAT[piece_idx * 64 + sq]
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_piece_remove(hash_val: np.uint64, piece_idx: int, sq: int) -> np.uint64:
     """Update hash for removing a piece."""
-    hash_val ^= ZOBRIST_PIECES[piece_idx][sq]
+    hash_val ^= ZOBRIST_PIECES_FLAT[piece_idx * 64 + sq]
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_castling(hash_val: np.uint64, old_castling: int, new_castling: int) -> np.uint64:
     """Update hash for castling rights change."""
     hash_val ^= ZOBRIST_CASTLING[old_castling]
@@ -882,7 +1203,7 @@ def update_hash_castling(hash_val: np.uint64, old_castling: int, new_castling: i
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_ep(hash_val: np.uint64, old_ep: int, new_ep: int) -> np.uint64:
     """Update hash for en passant square change."""
     if old_ep >= 0:
@@ -892,7 +1213,7 @@ def update_hash_ep(hash_val: np.uint64, old_ep: int, new_ep: int) -> np.uint64:
     return hash_val
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def update_hash_side(hash_val: np.uint64) -> np.uint64:
     """Update hash for side to move flip."""
     hash_val ^= ZOBRIST_SIDE
@@ -907,75 +1228,136 @@ class Board:
     """
     Minimal wrapper around bitboard state.
     All logic in numba - this is just API sugar.
+
+    The properties (current_player, halfmove_clock, ...) are convenience
+    accessors for UI/API code only. Search-path code must read the raw
+    numpy state directly (state[META] plus the unpack_* helpers, as
+    evaluation and move generation already do) - a Python property access
+    per node costs far more than the work it wraps.
     """
-    __slots__ = ('state', 'fullmove')
-    
-    def __init__(self, fen: str = None):
-        """Create board from FEN or starting position."""
+    # Preallocated undo-stack depth; doubled on demand for very long games
+    UNDO_STACK_DEPTH = 256
+    UNDO_RECORD_WIDTH = UNDO_RECORD_WIDTH  # Module-level constant (see make/unmake)
+
+    __slots__ = ('state', 'position_history', 'undo_stack', 'ply')
+
+    def __init__(self, fen: str = None, track_history: bool = False):
+        """
+        Create board from FEN or starting position.
+
+        track_history keeps a list of 8-byte Zobrist keys (one per position)
+        for repetition detection. The hash is maintained incrementally by
+        make/unmake, so tracking costs one list append per move - leave it
+        off for search-internal boards.
+        """
         if fen:
-            self.state, self.fullmove = from_fen(fen)
+            self.state = from_fen(fen)
         else:
             self.state = create_initial_state()
-            self.fullmove = 1
-    
+        self.position_history = [np.uint64(self.state[HASH])] if track_history else None
+        self.undo_stack = np.zeros((self.UNDO_STACK_DEPTH, self.UNDO_RECORD_WIDTH), dtype=np.int64)
+        self.ply = 0
+
     def copy(self):
-        """Deep copy."""
+        """Deep copy (explicit array clones - no deepcopy machinery)."""
         new_board = Board.__new__(Board)
         new_board.state = copy_state(self.state)
-        new_board.fullmove = self.fullmove
+        new_board.position_history = (
+            list(self.position_history) if self.position_history is not None else None
+        )
+        # Only the live prefix of the undo stack carries state
+        new_board.undo_stack = np.zeros_like(self.undo_stack)
+        new_board.undo_stack[:self.ply] = self.undo_stack[:self.ply]
+        new_board.ply = self.ply
         return new_board
-    
+
+    def copy_into(self, dst: 'Board'):
+        """
+        Copy this position into an existing board, allocating nothing.
+
+        For callers that copy in a loop (PV walking, repeated probing):
+        allocate one scratch board outside the loop and refill it here.
+        The destination starts a fresh undo history - it receives the
+        position, not the path that led to it.
+        """
+        dst.state[:] = self.state
+        dst.position_history = (
+            list(self.position_history) if self.position_history is not None else None
+        )
+        dst.ply = 0
+
     def make_move(self, move: np.uint16):
-        """Execute move and update fullmove counter."""
-        undo_info = make_move_numba(self.state, move)
-        if unpack_side(self.state[META]) == 0:  # Side flipped, was black
-            self.fullmove += 1
+        """Execute move (clocks live in metadata, updated inside the kernel)."""
+        if self.ply == len(self.undo_stack):  # Very long game - grow stack
+            self.undo_stack = np.vstack((self.undo_stack, np.zeros_like(self.undo_stack)))
+        undo_info = self.undo_stack[self.ply]
+        make_move_numba(self.state, move, undo_info)
+        self.ply += 1
+        if self.position_history is not None:
+            self.position_history.append(np.uint64(self.state[HASH]))
         return undo_info
-    
+
     def unmake_move(self, move: np.uint16, undo_info: np.ndarray):
-        """Undo move and restore fullmove counter."""
-        if unpack_side(self.state[META]) == 0:  # Currently white, will be black
-            self.fullmove -= 1
+        """Undo move (metadata restore brings the clocks back too)."""
         unmake_move_numba(self.state, move, undo_info)
+        self.ply -= 1
+        if self.position_history is not None:
+            self.position_history.pop()
+
+    def is_threefold_repetition(self) -> bool:
+        """Check if the current position has occurred three times."""
+        if self.position_history is None:
+            return False
+        current = np.uint64(self.state[HASH])
+        count = 0
+        for key in self.position_history:
+            if key == current:
+                count += 1
+        return count >= 3
     
     def make_null_move(self) -> np.ndarray:
         """
         Make a null move (pass turn, no piece moved).
         Used for null move pruning in search.
-        Returns undo info to restore the position.
+        Returns undo info (a slot of the shared undo stack, not a fresh
+        allocation - null moves pay the same zero-alloc cost as real ones).
         """
-        # Save old metadata
+        if self.ply == len(self.undo_stack):  # Very long game - grow stack
+            self.undo_stack = np.vstack((self.undo_stack, np.zeros_like(self.undo_stack)))
+        undo_info = self.undo_stack[self.ply]
+        self.ply += 1
+
+        # Save old metadata (same record layout as make_move: meta in [0],
+        # hash bit-pattern in [3])
         old_meta = self.state[META]
         old_hash = self.state[HASH]
-        
-        # Flip side to move
-        side = unpack_side(old_meta)
-        new_meta = old_meta ^ np.uint64(1)  # Toggle side bit
-        
-        # Clear en passant (it expires)
-        new_meta &= ~(np.uint64(0xFF) << 2)  # Clear EP file bits
-        
-        self.state[META] = new_meta
-        
+        undo_info[0] = old_meta.astype(np.int64)
+        undo_info[3] = old_hash.astype(np.int64)
+
+        # Flip side (bit 20) and clear en passant (bits 4-10, it expires)
+        meta = int(old_meta)
+        new_meta = (meta & ~(0x7F << 4)) ^ (1 << 20)
+        self.state[META] = np.uint64(new_meta)
+
         # Update hash (flip side, clear EP if any)
         new_hash = old_hash ^ ZOBRIST_SIDE
-        ep_file = (old_meta >> 2) & 0xFF
-        if ep_file < 8:
-            new_hash ^= ZOBRIST_EP[ep_file]
-        
+        ep_square = ((meta >> 4) & 0x7F) - 1
+        if ep_square >= 0:
+            new_hash ^= ZOBRIST_EP[ep_square & 7]
+
         self.state[HASH] = new_hash
-        
-        # Return undo info
-        return np.array([old_meta, old_hash], dtype=np.uint64)
-    
+
+        return undo_info
+
     def unmake_null_move(self, undo_info: np.ndarray):
         """Undo null move."""
-        self.state[META] = undo_info[0]
-        self.state[HASH] = undo_info[1]
+        self.state[META] = undo_info[0].astype(np.uint64)
+        self.state[HASH] = undo_info[3].astype(np.uint64)
+        self.ply -= 1
     
     def to_fen(self) -> str:
         """Export to FEN notation."""
-        return to_fen(self.state, self.fullmove)
+        return to_fen(self.state)
     
     @classmethod
     def from_fen(cls, fen: str) -> 'Board':
@@ -987,6 +1369,9 @@ class Board:
         """Side to move."""
         return Color(unpack_side(self.state[META]))
     
+    # Compatibility accessors for external callers. Hot paths never use
+    # these - jitted code unpacks castling/EP straight out of the META
+    # word with the inlined unpack_* helpers.
     @property
     def castling_rights(self) -> int:
         """Castling rights bitmask."""
@@ -1004,14 +1389,16 @@ class Board:
     def halfmove_clock(self) -> int:
         """Halfmove clock for 50-move rule."""
         return unpack_halfmove(self.state[META])
+
+    @property
+    def fullmove(self) -> int:
+        """Fullmove number (maintained inside the make-move kernel)."""
+        return (int(self.state[META]) >> 21) & 0x7FFF
     
     def display(self) -> str:
         """ASCII board display."""
-        pieces = {
-            0: ('P', 'p'), 1: ('N', 'n'), 2: ('B', 'b'),
-            3: ('R', 'r'), 4: ('Q', 'q'), 5: ('K', 'k')
-        }
-        
+        pieces = PIECE_CHARS
+
         output = "  a b c d e f g h\n"
         for row in range(8):
             output += f"{8 - row} "
@@ -1038,6 +1425,7 @@ __all__ = [
     'CASTLE_WK', 'CASTLE_WQ', 'CASTLE_BK', 'CASTLE_BQ', 'CASTLE_ALL',
     'WP', 'WN', 'WB', 'WR', 'WQ', 'WK',
     'BP', 'BN', 'BB', 'BR', 'BQ', 'BK',
-    'OCCUPIED', 'META'
+    'OCCUPIED', 'META', 'WHITE_OCC', 'BLACK_OCC',
+    'EVAL_MID', 'EVAL_END', 'EVAL_BIAS', 'MATERIAL', 'MAILBOX'
 ]
 
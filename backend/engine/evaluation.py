@@ -1,6 +1,18 @@
 """
 Evaluation - Bitboard Implementation
 Positional evaluation with material, piece-square tables, and tactical bonuses.
+
+The material + PSQT terms are maintained incrementally by make/unmake
+(board.py, via the COMBINED tensors in psqt.py), so the per-node
+evaluate() is O(1): pick the phase, read a slot, apply the side sign.
+evaluate_numpy() recomputes from scratch and doubles as the reference
+the incremental terms are checked against.
+
+There is deliberately no Zobrist-keyed evaluation cache: with the
+terms carried in the state vector, a hashed probe (index, compare,
+possible store) costs more than the evaluation it would short-circuit.
+If evaluation ever grows terms too expensive to maintain per move
+(pawn structure, king safety), cache those terms, not the total.
 """
 
 import numpy as np
@@ -8,188 +20,87 @@ from numba import njit
 from engine.board import (
     WP, WN, WB, WR, WQ, WK,
     BP, BN, BB, BR, BQ, BK,
-    META, unpack_side,
-    lsb, clear_bit, pop_count
+    META, EVAL_MID, EVAL_END, EVAL_BIAS, MATERIAL,
+    unpack_side, pop_count
 )
+from engine.psqt import PIECE_VALUES, COMBINED_MID, COMBINED_END
+
 
-# Piece values (centipawns)
-PIECE_VALUES = np.array([100, 320, 330, 500, 900, 20000], dtype=np.int32)  # P,N,B,R,Q,K
-
-# Piece-Square Tables (from white's perspective, rank 0 = rank 8)
-# Values are bonuses in centipawns
-
-PAWN_TABLE = np.array([
-    [  0,   0,   0,   0,   0,   0,   0,   0],
-    [ 50,  50,  50,  50,  50,  50,  50,  50],
-    [ 10,  10,  20,  30,  30,  20,  10,  10],
-    [  5,   5,  10,  25,  25,  10,   5,   5],
-    [  0,   0,   0,  20,  20,   0,   0,   0],
-    [  5,  -5, -10,   0,   0, -10,  -5,   5],
-    [  5,  10,  10, -20, -20,  10,  10,   5],
-    [  0,   0,   0,   0,   0,   0,   0,   0]
-], dtype=np.int32)
-
-KNIGHT_TABLE = np.array([
-    [-50, -40, -30, -30, -30, -30, -40, -50],
-    [-40, -20,   0,   0,   0,   0, -20, -40],
-    [-30,   0,  10,  15,  15,  10,   0, -30],
-    [-30,   5,  15,  20,  20,  15,   5, -30],
-    [-30,   0,  15,  20,  20,  15,   0, -30],
-    [-30,   5,  10,  15,  15,  10,   5, -30],
-    [-40, -20,   0,   5,   5,   0, -20, -40],
-    [-50, -40, -30, -30, -30, -30, -40, -50]
-], dtype=np.int32)
-
-BISHOP_TABLE = np.array([
-    [-20, -10, -10, -10, -10, -10, -10, -20],
-    [-10,   0,   0,   0,   0,   0,   0, -10],
-    [-10,   0,   5,  10,  10,   5,   0, -10],
-    [-10,   5,   5,  10,  10,   5,   5, -10],
-    [-10,   0,  10,  10,  10,  10,   0, -10],
-    [-10,  10,  10,  10,  10,  10,  10, -10],
-    [-10,   5,   0,   0,   0,   0,   5, -10],
-    [-20, -10, -10, -10, -10, -10, -10, -20]
-], dtype=np.int32)
-
-ROOK_TABLE = np.array([
-    [  0,   0,   0,   0,   0,   0,   0,   0],
-    [  5,  10,  10,  10,  10,  10,  10,   5],
-    [ -5,   0,   0,   0,   0,   0,   0,  -5],
-    [ -5,   0,   0,   0,   0,   0,   0,  -5],
-    [ -5,   0,   0,   0,   0,   0,   0,  -5],
-    [ -5,   0,   0,   0,   0,   0,   0,  -5],
-    [ -5,   0,   0,   0,   0,   0,   0,  -5],
-    [  0,   0,   0,   5,   5,   0,   0,   0]
-], dtype=np.int32)
-
-QUEEN_TABLE = np.array([
-    [-20, -10, -10,  -5,  -5, -10, -10, -20],
-    [-10,   0,   0,   0,   0,   0,   0, -10],
-    [-10,   0,   5,   5,   5,   5,   0, -10],
-    [ -5,   0,   5,   5,   5,   5,   0,  -5],
-    [  0,   0,   5,   5,   5,   5,   0,  -5],
-    [-10,   5,   5,   5,   5,   5,   0, -10],
-    [-10,   0,   5,   0,   0,   0,   0, -10],
-    [-20, -10, -10,  -5,  -5, -10, -10, -20]
-], dtype=np.int32)
-
-KING_MIDDLEGAME_TABLE = np.array([
-    [-30, -40, -40, -50, -50, -40, -40, -30],
-    [-30, -40, -40, -50, -50, -40, -40, -30],
-    [-30, -40, -40, -50, -50, -40, -40, -30],
-    [-30, -40, -40, -50, -50, -40, -40, -30],
-    [-20, -30, -30, -40, -40, -30, -30, -20],
-    [-10, -20, -20, -20, -20, -20, -20, -10],
-    [ 20,  20,   0,   0,   0,   0,  20,  20],
-    [ 20,  30,  10,   0,   0,  10,  30,  20]
-], dtype=np.int32)
-
-KING_ENDGAME_TABLE = np.array([
-    [-50, -40, -30, -20, -20, -30, -40, -50],
-    [-30, -20, -10,   0,   0, -10, -20, -30],
-    [-30, -10,  20,  30,  30,  20, -10, -30],
-    [-30, -10,  30,  40,  40,  30, -10, -30],
-    [-30, -10,  30,  40,  40,  30, -10, -30],
-    [-30, -10,  20,  30,  30,  20, -10, -30],
-    [-30, -30,   0,   0,   0,   0, -30, -30],
-    [-50, -30, -30, -30, -30, -30, -30, -50]
-], dtype=np.int32)
-
-# Pre-flip tables for black (mirror vertically)
-PAWN_TABLE_BLACK = np.flipud(PAWN_TABLE)
-KNIGHT_TABLE_BLACK = np.flipud(KNIGHT_TABLE)
-BISHOP_TABLE_BLACK = np.flipud(BISHOP_TABLE)
-ROOK_TABLE_BLACK = np.flipud(ROOK_TABLE)
-QUEEN_TABLE_BLACK = np.flipud(QUEEN_TABLE)
-KING_MIDDLEGAME_TABLE_BLACK = np.flipud(KING_MIDDLEGAME_TABLE)
-KING_ENDGAME_TABLE_BLACK = np.flipud(KING_ENDGAME_TABLE)
-
-
-@njit
+@njit(cache=True, nogil=True, boundscheck=False)
 def evaluate(state: np.ndarray) -> int:
     """
     Evaluate position from current side's perspective.
-    
+
     Returns score in centipawns (positive = good for side to move).
+    Material, piece-square bonuses and the phase-material total were all
+    accumulated incrementally as moves were made, so this is O(1): one
+    comparison picks the phase and one slot read gives the score.
     """
     side = unpack_side(state[META])
-    
-    # Material and positional score (from white's perspective)
-    score = 0
-    
-    # Check if endgame (low material)
-    total_material = 0
-    for piece_idx in range(5):  # Exclude king
-        white_pieces = state[WP + piece_idx]
-        black_pieces = state[BP + piece_idx]
-        piece_value = int(PIECE_VALUES[piece_idx])
-        total_material += pop_count(white_pieces) * piece_value
-        total_material += pop_count(black_pieces) * piece_value
-    
-    is_endgame = total_material < 2500  # Roughly 2 minor pieces per side
-    
-    # Evaluate white pieces
-    score += evaluate_pieces(state, 0, is_endgame)
-    
-    # Evaluate black pieces (negate)
-    score -= evaluate_pieces(state, 1, is_endgame)
-    
-    # Return from current side's perspective
-    return score if side == 0 else -score
-
-
-@njit
-def evaluate_pieces(state: np.ndarray, color: int, is_endgame: bool) -> int:
-    """Evaluate all pieces for one color."""
-    score = 0
-    piece_start = WP if color == 0 else BP
-    
-    # Evaluate each piece type
-    for piece_idx in range(5):  # P, N, B, R, Q
-        pieces = state[piece_start + piece_idx]
-        piece_value = int(PIECE_VALUES[piece_idx])
-        
-        # Select appropriate table
-        if piece_idx == 0:  # Pawn
-            table = PAWN_TABLE if color == 0 else PAWN_TABLE_BLACK
-        elif piece_idx == 1:  # Knight
-            table = KNIGHT_TABLE if color == 0 else KNIGHT_TABLE_BLACK
-        elif piece_idx == 2:  # Bishop
-            table = BISHOP_TABLE if color == 0 else BISHOP_TABLE_BLACK
-        elif piece_idx == 3:  # Rook
-            table = ROOK_TABLE if color == 0 else ROOK_TABLE_BLACK
-        else:  # Queen
-            table = QUEEN_TABLE if color == 0 else QUEEN_TABLE_BLACK
-        
-        while pieces:
-            sq = lsb(pieces)
-            pieces = clear_bit(pieces, sq)
-            
-            row = sq // 8
-            col = sq % 8
-            
-            # Material + position
-            score += piece_value + int(table[row, col])
-    
-    # Evaluate king
-    king = state[piece_start + 5]
-    if king:
-        sq = lsb(king)
-        row = sq // 8
-        col = sq % 8
-        
-        # Select king table based on game phase and color
-        if is_endgame:
-            king_table = KING_ENDGAME_TABLE if color == 0 else KING_ENDGAME_TABLE_BLACK
-        else:
-            king_table = KING_MIDDLEGAME_TABLE if color == 0 else KING_MIDDLEGAME_TABLE_BLACK
-        
-        score += int(PIECE_VALUES[5]) + int(king_table[row, col])
-    
-    return score
-
-
-@njit
+
+    # Roughly 2 minor pieces per side left -> endgame king table. The
+    # comparison selects the slot arithmetically (EVAL_END == EVAL_MID+1)
+    # so the phase pick compiles to a conditional move, not a branch.
+    slot = EVAL_MID + (1 if int(state[MATERIAL]) < 2500 else 0)
+    score = np.int64(state[slot]) - EVAL_BIAS
+
+    # Return from current side's perspective (sign factor, no branch)
+    return int(score) * (1 - 2 * side)
+
+
+def evaluate_numpy(state: np.ndarray) -> int:
+    """
+    Vectorized pure-NumPy evaluation - identical result to evaluate().
+
+    Expands the twelve piece bitboards into a (12, 64) bit matrix with a
+    single unpackbits and reduces it against the COMBINED tensor in a
+    handful of C-level array ops. Recomputes from scratch rather than
+    reading the incremental slots, so it serves as the reference that
+    validates make/unmake's eval bookkeeping; it also needs no JIT
+    warm-up, making it the right path for tools and tests that score a
+    few positions.
+    """
+    # int32 up front: uint8 bits would promote the dot below to int16
+    # and overflow; one cast here keeps every reduction in safe lanes
+    bits = np.unpackbits(
+        state[WP:BK + 1].view(np.uint8),
+        bitorder='little').reshape(12, 64).astype(np.int32)
+    counts = bits.sum(axis=1)
+
+    # Phase from non-king material of both sides (kings must not count
+    # toward the endgame threshold)
+    total_material = int(
+        np.dot(counts[WP:WK], PIECE_VALUES[WP:WK].astype(np.int32)) +
+        np.dot(counts[BP:BK], PIECE_VALUES[WP:WK].astype(np.int32)))
+
+    # Flatten-and-dot fuses multiply and reduce in one BLAS pass with no
+    # (12, 64) product temporary
+    combined = COMBINED_END if total_material < 2500 else COMBINED_MID
+    score = int(np.dot(bits.ravel(), combined.ravel()))
+
+    side = unpack_side(state[META])
+    return score * (1 - 2 * side)
+
+
+def evaluate_batch(states: np.ndarray) -> np.ndarray:
+    """
+    Evaluate N positions at once. states is an (N, STATE_SIZE) stack of
+    state vectors; returns an (N,) int64 array of side-to-move scores.
+
+    Because the eval terms ride in the state vectors, batch scoring is
+    pure slot arithmetic - a phase compare, a fancy-indexed gather and a
+    sign flip over the whole batch in a few C-level ops. A parallel
+    prange kernel would spend more on thread fan-out than the two loads
+    per position it parallelizes.
+    """
+    n = len(states)
+    slots = EVAL_MID + (states[:, MATERIAL].astype(np.int64) < 2500)
+    score = states[np.arange(n), slots].astype(np.int64) - EVAL_BIAS
+    side = ((states[:, META] >> np.uint64(20)) & np.uint64(1)).astype(np.int64)
+    return score * (1 - 2 * side)
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
 def evaluate_simple(state: np.ndarray) -> int:
     """
     Simple material-only evaluation (faster).
@@ -197,7 +108,7 @@ def evaluate_simple(state: np.ndarray) -> int:
     """
     side = unpack_side(state[META])
     score = 0
-    
+
     # Count material for each piece type
     for piece_idx in range(6):
         white_pieces = state[WP + piece_idx]
@@ -206,34 +117,65 @@ def evaluate_simple(state: np.ndarray) -> int:
         black_count = pop_count(black_pieces)
         piece_value = int(PIECE_VALUES[piece_idx])
         score += piece_value * (white_count - black_count)
-    
-    return score if side == 0 else -score
+
+    return score * (1 - 2 * side)
 
 
 # Example usage
 if __name__ == "__main__":
     from engine.board import Board
-    
+
     print("Testing evaluation function\n")
-    
+
     # Starting position should be near 0
     board = Board()
     score = evaluate(board.state)
     print(f"Starting position: {score} cp")
-    
+
     # After 1.e4
     board = Board.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
     score = evaluate(board.state)
     print(f"After 1.e4: {score} cp")
-    
+
     # White up a queen
     board = Board.from_fen("rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPQPPP/RNB1KBNR b KQkq - 0 1")
     score = evaluate(board.state)
     print(f"White up a queen: {score} cp")
-    
+
     # Endgame position
     board = Board.from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1")
     score = evaluate(board.state)
     print(f"Endgame position: {score} cp")
-    
+
+    # The incremental terms must agree with the from-scratch NumPy path,
+    # both on fresh positions and through a make/unmake sequence
+    for fen in [
+        None,
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPQPPP/RNB1KBNR b KQkq - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    ]:
+        board = Board(fen=fen)
+        assert evaluate_numpy(board.state) == evaluate(board.state)
+
+    from engine.moves import Moves
+    board = Board()
+    for _ in range(6):  # Walk a short line, checking every node
+        moves = Moves(board).generate()
+        undo = board.make_move(moves[0])
+        assert evaluate_numpy(board.state) == evaluate(board.state)
+    print("Incremental terms match the from-scratch NumPy path")
+
+    # Batch evaluation must agree with per-position evaluation
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPPQPPP/RNB1KBNR b KQkq - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    ]
+    states = np.stack([Board.from_fen(f).state for f in fens])
+    batch = evaluate_batch(states)
+    for i, f in enumerate(fens):
+        assert batch[i] == evaluate(Board.from_fen(f).state)
+    print("Batch path matches per-position path")
+
     print("\n✓ Evaluation tests complete")
@@ -2,11 +2,15 @@
 Move Generation - Bitboard Implementation
 Generates legal moves using bitboards and pre-computed attack tables.
 All hot paths compiled with numba for maximum performance.
+
+Moves are plain uint16 values everywhere (see the encoding in
+board.py) - generation, search and make/unmake never build per-move
+objects, and human-readable forms are produced only at the UI/UCI
+boundary.
 """
 
 import numpy as np
 from numba import njit
-from numba.typed import List
 from typing import Tuple
 
 # Import from board.py
@@ -14,7 +18,7 @@ from engine.board import (
     # State indices
     WP, WN, WB, WR, WQ, WK,
     BP, BN, BB, BR, BQ, BK,
-    OCCUPIED, META,
+    OCCUPIED, META, WHITE_OCC, BLACK_OCC,
     # Move encoding
     encode_move, decode_move,
     FLAG_NORMAL, FLAG_PROMOTION_QUEEN, FLAG_PROMOTION_ROOK,
@@ -27,38 +31,82 @@ from engine.board import (
     A8, B8, C8, D8, E8, F8, G8, H8,
     # Bitboard operations
     get_bit, set_bit, clear_bit, lsb, pop_count,
-    square_to_coords, coords_to_square,
     # Metadata unpacking
     unpack_castling, unpack_ep_square, unpack_side,
     # Attack generation
     KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
     rook_attacks, bishop_attacks, queen_attacks,
     # Move execution
-    make_move_numba, unmake_move_numba,
+    make_move_numba, unmake_move_numba, UNDO_RECORD_WIDTH,
 )
 
 # ============================================================================
 # MOVE GENERATION (ALL NUMBA)
 # ============================================================================
 
-@njit(cache=True)
-def generate_pawn_moves(state: np.ndarray, color: int, moves):
-    """Generate pawn moves (pushes, captures, promotions, en passant)."""
+# Upper bound on moves in any reachable position (218 is the known
+# maximum; 256 keeps the emit buffer a round power of two)
+MAX_MOVES = 256
+
+# Castling path emptiness masks: the squares between king and rook that
+# must be vacant, so one AND against occupancy answers the whole path
+# instead of one get_bit test per square
+CASTLE_EMPTY_WK = np.uint64((1 << F1) | (1 << G1))
+CASTLE_EMPTY_WQ = np.uint64((1 << B1) | (1 << C1) | (1 << D1))
+CASTLE_EMPTY_BK = np.uint64((1 << F8) | (1 << G8))
+CASTLE_EMPTY_BQ = np.uint64((1 << B8) | (1 << C8) | (1 << D8))
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def _emit_pawn_capture(from_sq: int, cap_sq: int, promo_rank: int,
+                       opponent_pieces: np.uint64, ep_square: int,
+                       moves, n: int) -> int:
+    """Emit the capture (plus promotions / en passant) of one pawn
+    toward one already-validated diagonal target square."""
+    # Normal capture
+    if get_bit(opponent_pieces, cap_sq):
+        # Promotion capture
+        if (cap_sq >> 3) == promo_rank:
+            moves[n] = encode_move(from_sq, cap_sq, FLAG_PROMOTION_QUEEN)
+            n += 1
+            moves[n] = encode_move(from_sq, cap_sq, FLAG_PROMOTION_ROOK)
+            n += 1
+            moves[n] = encode_move(from_sq, cap_sq, FLAG_PROMOTION_BISHOP)
+            n += 1
+            moves[n] = encode_move(from_sq, cap_sq, FLAG_PROMOTION_KNIGHT)
+            n += 1
+        else:
+            moves[n] = encode_move(from_sq, cap_sq, FLAG_NORMAL)
+            n += 1
+
+    # En passant - check independently
+    if ep_square >= 0 and cap_sq == ep_square:
+        moves[n] = encode_move(from_sq, cap_sq, FLAG_EN_PASSANT)
+        n += 1
+
+    return n
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_pawn_moves(state: np.ndarray, color: int, moves, n: int,
+                        captures_only: bool) -> int:
+    """Generate pawn moves (pushes, captures, promotions, en passant).
+
+    With captures_only, quiet non-promotion pushes are skipped -
+    promotions always come out because quiescence treats them as
+    tactical moves."""
     pawn_idx = WP if color == 0 else BP
     pawns = state[pawn_idx]
     occupied = state[OCCUPIED]
-    opponent_pieces = np.uint64(0)
     
-    # Get opponent pieces
+    # Opponent pieces come straight from the maintained occupancy slot
     if color == 0:  # White
-        for i in range(6):
-            opponent_pieces |= state[BP + i]
+        opponent_pieces = state[BLACK_OCC]
         push_dir = -8  # Move up the board
         start_rank = 6  # Rank 2 (row 6)
         promo_rank = 0  # Rank 8 (row 0)
     else:  # Black
-        for i in range(6):
-            opponent_pieces |= state[WP + i]
+        opponent_pieces = state[WHITE_OCC]
         push_dir = 8  # Move down the board
         start_rank = 1  # Rank 7 (row 1)
         promo_rank = 7  # Rank 1 (row 7)
@@ -70,217 +118,276 @@ def generate_pawn_moves(state: np.ndarray, color: int, moves):
     while pawns:
         from_sq = lsb(pawns)
         pawns = clear_bit(pawns, from_sq)
-        
-        row, col = square_to_coords(from_sq)
+
         to_sq = from_sq + push_dir
-        
+
         # Single push
         if not get_bit(occupied, to_sq):
-            to_row = row + (1 if color == 1 else -1)
-            
             # Promotion
-            if to_row == promo_rank:
-                moves.append(encode_move(from_sq, to_sq, FLAG_PROMOTION_QUEEN))
-                moves.append(encode_move(from_sq, to_sq, FLAG_PROMOTION_ROOK))
-                moves.append(encode_move(from_sq, to_sq, FLAG_PROMOTION_BISHOP))
-                moves.append(encode_move(from_sq, to_sq, FLAG_PROMOTION_KNIGHT))
-            else:
-                moves.append(encode_move(from_sq, to_sq, FLAG_NORMAL))
-                
+            if (to_sq >> 3) == promo_rank:
+                moves[n] = encode_move(from_sq, to_sq, FLAG_PROMOTION_QUEEN)
+                n += 1
+                moves[n] = encode_move(from_sq, to_sq, FLAG_PROMOTION_ROOK)
+                n += 1
+                moves[n] = encode_move(from_sq, to_sq, FLAG_PROMOTION_BISHOP)
+                n += 1
+                moves[n] = encode_move(from_sq, to_sq, FLAG_PROMOTION_KNIGHT)
+                n += 1
+            elif not captures_only:
+                moves[n] = encode_move(from_sq, to_sq, FLAG_NORMAL)
+                n += 1
+
                 # Double push
-                if row == start_rank:
+                if (from_sq >> 3) == start_rank:
                     to_sq2 = from_sq + 2 * push_dir
                     if not get_bit(occupied, to_sq2):
-                        moves.append(encode_move(from_sq, to_sq2, FLAG_NORMAL))
-        
-        # Captures (left and right)
-        for cap_offset in [-1, 1]:
-            cap_col = col + cap_offset
-            if 0 <= cap_col < 8:
-                cap_sq = coords_to_square(row + (1 if color == 1 else -1), cap_col)
-                
-                # Normal capture
-                if get_bit(opponent_pieces, cap_sq):
-                    cap_row = row + (1 if color == 1 else -1)
-                    
-                    # Promotion capture
-                    if cap_row == promo_rank:
-                        moves.append(encode_move(from_sq, cap_sq, FLAG_PROMOTION_QUEEN))
-                        moves.append(encode_move(from_sq, cap_sq, FLAG_PROMOTION_ROOK))
-                        moves.append(encode_move(from_sq, cap_sq, FLAG_PROMOTION_BISHOP))
-                        moves.append(encode_move(from_sq, cap_sq, FLAG_PROMOTION_KNIGHT))
-                    else:
-                        moves.append(encode_move(from_sq, cap_sq, FLAG_NORMAL))
-                
-                # En passant - check independently
-                if ep_square >= 0 and cap_sq == ep_square:
-                    moves.append(encode_move(from_sq, cap_sq, FLAG_EN_PASSANT))
-
-
-@njit(cache=True)
-def generate_knight_moves(state: np.ndarray, color: int, moves):
+                        moves[n] = encode_move(from_sq, to_sq2, FLAG_NORMAL)
+                        n += 1
+
+        # Captures, unrolled into explicit left/right bodies - iterating
+        # a literal [-1, 1] list per pawn made numba materialize and walk
+        # a real container in the innermost generator loop
+        file = from_sq & 7
+        if file > 0:
+            n = _emit_pawn_capture(from_sq, to_sq - 1, promo_rank,
+                                   opponent_pieces, ep_square, moves, n)
+        if file < 7:
+            n = _emit_pawn_capture(from_sq, to_sq + 1, promo_rank,
+                                   opponent_pieces, ep_square, moves, n)
+
+    return n
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def _emit_moves_from(from_sq: int, attacks: np.uint64, moves, n: int) -> int:
+    """Emit a normal move for every set bit of the attack set - the
+    one emission loop shared by knight, slider and king generation."""
+    while attacks:
+        to_sq = lsb(attacks)
+        attacks = clear_bit(attacks, to_sq)
+        moves[n] = encode_move(from_sq, to_sq, FLAG_NORMAL)
+        n += 1
+    return n
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_knight_moves(state: np.ndarray, color: int, moves, n: int,
+                          captures_only: bool) -> int:
     """Generate knight moves using pre-computed attack table."""
     knight_idx = WN if color == 0 else BN
     knights = state[knight_idx]
-    own_pieces = np.uint64(0)
-    
-    # Get own pieces
-    start_idx = WP if color == 0 else BP
-    for i in range(6):
-        own_pieces |= state[start_idx + i]
-    
+    own_pieces = state[WHITE_OCC] if color == 0 else state[BLACK_OCC]
+
+    # Masking the attack set with enemy occupancy instead of ~own turns
+    # the captures-only stage into the same loop with a different mask
+    if captures_only:
+        targets = state[BLACK_OCC] if color == 0 else state[WHITE_OCC]
+    else:
+        targets = ~own_pieces
+
     while knights:
         from_sq = lsb(knights)
         knights = clear_bit(knights, from_sq)
-        
-        # Get attacks from pre-computed table
-        attacks = KNIGHT_ATTACKS[from_sq]
-        
-        # Remove attacks on own pieces
-        attacks &= ~own_pieces
-        
-        # Generate moves
-        while attacks:
-            to_sq = lsb(attacks)
-            attacks = clear_bit(attacks, to_sq)
-            moves.append(encode_move(from_sq, to_sq, FLAG_NORMAL))
+        n = _emit_moves_from(from_sq, KNIGHT_ATTACKS[from_sq] & targets, moves, n)
 
+    return n
 
-@njit(cache=True)
-def generate_sliding_moves(state: np.ndarray, color: int, piece_type: int, moves):
-    """Generate sliding piece moves (bishop, rook, queen)."""
-    if color == 0:  # White
-        piece_idx = WB + piece_type - 2  # Bishop=2→WB, Rook=3→WR, Queen=4→WQ
-        own_start = WP
-    else:  # Black
-        piece_idx = BB + piece_type - 2
-        own_start = BP
-    
-    pieces = state[piece_idx]
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_slider_moves(state: np.ndarray, color: int, moves, n: int,
+                          captures_only: bool) -> int:
+    """
+    Generate bishop, rook and queen moves in one pass.
+
+    Queens ride both sub-passes - diagonal together with the bishops,
+    straight together with the rooks - so the loops carry no per-piece
+    type dispatch and each slider costs exactly one magic lookup.
+    """
+    base = 6 * color
+    own_pieces = state[WHITE_OCC] if color == 0 else state[BLACK_OCC]
     occupied = state[OCCUPIED]
-    own_pieces = np.uint64(0)
-    
-    for i in range(6):
-        own_pieces |= state[own_start + i]
-    
+    queens = state[WQ + base]
+
+    if captures_only:
+        targets = state[BLACK_OCC] if color == 0 else state[WHITE_OCC]
+    else:
+        targets = ~own_pieces
+
+    pieces = state[WB + base] | queens
     while pieces:
         from_sq = lsb(pieces)
         pieces = clear_bit(pieces, from_sq)
-        
-        # Get attacks based on piece type
-        if piece_type == 2:  # Bishop
-            attacks = bishop_attacks(from_sq, occupied)
-        elif piece_type == 3:  # Rook
-            attacks = rook_attacks(from_sq, occupied)
-        else:  # Queen
-            attacks = queen_attacks(from_sq, occupied)
-        
-        # Remove attacks on own pieces
-        attacks &= ~own_pieces
-        
-        while attacks:
-            to_sq = lsb(attacks)
-            attacks = clear_bit(attacks, to_sq)
-            moves.append(encode_move(from_sq, to_sq, FLAG_NORMAL))
+        n = _emit_moves_from(from_sq, bishop_attacks(from_sq, occupied) & targets, moves, n)
+
+    pieces = state[WR + base] | queens
+    while pieces:
+        from_sq = lsb(pieces)
+        pieces = clear_bit(pieces, from_sq)
+        n = _emit_moves_from(from_sq, rook_attacks(from_sq, occupied) & targets, moves, n)
 
+    return n
 
-@njit(cache=True)
-def generate_king_moves(state: np.ndarray, color: int, moves):
-    """Generate king moves (regular + castling)."""
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_king_moves(state: np.ndarray, color: int, moves, n: int,
+                        captures_only: bool) -> int:
+    """Generate king moves (regular + castling). The captures-only
+    stage masks with enemy occupancy and never castles."""
     king_idx = WK if color == 0 else BK
     king_bb = state[king_idx]
-    
+
     if king_bb == 0:
-        return  # No king (shouldn't happen)
-    
+        return n  # No king (shouldn't happen)
+
     from_sq = lsb(king_bb)
-    own_pieces = np.uint64(0)
-    
-    # Get own pieces
-    start_idx = WP if color == 0 else BP
-    for i in range(6):
-        own_pieces |= state[start_idx + i]
-    
+    own_pieces = state[WHITE_OCC] if color == 0 else state[BLACK_OCC]
+
+    if captures_only:
+        targets = state[BLACK_OCC] if color == 0 else state[WHITE_OCC]
+    else:
+        targets = ~own_pieces
+
     # Regular king moves
-    attacks = KING_ATTACKS[from_sq]
-    attacks &= ~own_pieces
-    
-    while attacks:
-        to_sq = lsb(attacks)
-        attacks = clear_bit(attacks, to_sq)
-        moves.append(encode_move(from_sq, to_sq, FLAG_NORMAL))
-    
+    n = _emit_moves_from(from_sq, KING_ATTACKS[from_sq] & targets, moves, n)
+
+    if captures_only:
+        return n
+
     # Castling
     castling = unpack_castling(state[META])
     occupied = state[OCCUPIED]
     
     if color == 0:  # White
         # Kingside (e1-g1)
-        if castling & CASTLE_WK:
-            if not get_bit(occupied, F1) and not get_bit(occupied, G1):
-                moves.append(encode_move(E1, G1, FLAG_CASTLING_KINGSIDE))
-        
+        if castling & CASTLE_WK and not occupied & CASTLE_EMPTY_WK:
+            moves[n] = encode_move(E1, G1, FLAG_CASTLING_KINGSIDE)
+            n += 1
+
         # Queenside (e1-c1)
-        if castling & CASTLE_WQ:
-            if not get_bit(occupied, D1) and not get_bit(occupied, C1) and not get_bit(occupied, B1):
-                moves.append(encode_move(E1, C1, FLAG_CASTLING_QUEENSIDE))
-    
+        if castling & CASTLE_WQ and not occupied & CASTLE_EMPTY_WQ:
+            moves[n] = encode_move(E1, C1, FLAG_CASTLING_QUEENSIDE)
+            n += 1
+
     else:  # Black
         # Kingside (e8-g8)
-        if castling & CASTLE_BK:
-            if not get_bit(occupied, F8) and not get_bit(occupied, G8):
-                moves.append(encode_move(E8, G8, FLAG_CASTLING_KINGSIDE))
-        
+        if castling & CASTLE_BK and not occupied & CASTLE_EMPTY_BK:
+            moves[n] = encode_move(E8, G8, FLAG_CASTLING_KINGSIDE)
+            n += 1
+
         # Queenside (e8-c8)
-        if castling & CASTLE_BQ:
-            if not get_bit(occupied, D8) and not get_bit(occupied, C8) and not get_bit(occupied, B8):
-                moves.append(encode_move(E8, C8, FLAG_CASTLING_QUEENSIDE))
+        if castling & CASTLE_BQ and not occupied & CASTLE_EMPTY_BQ:
+            moves[n] = encode_move(E8, C8, FLAG_CASTLING_QUEENSIDE)
+            n += 1
+
+    return n
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
 def is_square_attacked(state: np.ndarray, square: int, by_color: int) -> bool:
-    """Check if square is attacked by given color using bitboard attacks."""
+    """
+    Check if square is attacked by given color using bitboard attacks.
+
+    Each test is one AND against either a precomputed per-square table
+    (pawn/knight/king) or a magic lookup (sliders), with the first hit
+    returning early; the occupancy and per-type boards it reads are
+    maintained incrementally by make/unmake, so nothing is recomputed
+    here.
+    """
     occupied = state[OCCUPIED]
-    
-    # Check pawn attacks
-    pawn_idx = WP if by_color == 0 else BP
-    pawns = state[pawn_idx]
+    # Piece slots for the attacking color by offset arithmetic instead
+    # of one conditional per piece type
+    base = 6 * by_color
+
     # Pawn attacks are from opponent's perspective
-    pawn_attack_bb = PAWN_ATTACKS[1 - by_color, square]
-    if pawns & pawn_attack_bb:
+    if state[WP + base] & PAWN_ATTACKS[1 - by_color, square]:
         return True
-    
-    # Check knight attacks
-    knight_idx = WN if by_color == 0 else BN
-    knights = state[knight_idx]
-    if knights & KNIGHT_ATTACKS[square]:
+
+    if state[WN + base] & KNIGHT_ATTACKS[square]:
         return True
-    
-    # Check king attacks
-    king_idx = WK if by_color == 0 else BK
-    king = state[king_idx]
-    if king & KING_ATTACKS[square]:
+
+    if state[WK + base] & KING_ATTACKS[square]:
         return True
-    
-    # Check bishop/queen diagonal attacks
-    bishop_idx = WB if by_color == 0 else BB
-    queen_idx = WQ if by_color == 0 else BQ
-    diag_attackers = state[bishop_idx] | state[queen_idx]
-    if diag_attackers & bishop_attacks(square, occupied):
+
+    # Sliders: queens ride along both the diagonal and straight tests
+    queens = state[WQ + base]
+    if (state[WB + base] | queens) & bishop_attacks(square, occupied):
         return True
-    
-    # Check rook/queen straight attacks
-    rook_idx = WR if by_color == 0 else BR
-    straight_attackers = state[rook_idx] | state[queen_idx]
-    if straight_attackers & rook_attacks(square, occupied):
+
+    if (state[WR + base] | queens) & rook_attacks(square, occupied):
         return True
-    
+
     return False
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
+def _init_line_bb() -> np.ndarray:
+    """
+    LINE_BB[a, b]: the full board line through squares a and b (both
+    included), or 0 if they are not aligned. Lets the legality filter
+    test 'does this pinned piece stay on its pin ray' with one load
+    and one AND.
+    """
+    line = np.zeros((64, 64), dtype=np.uint64)
+    dirs = np.array([[1, 0], [0, 1], [1, 1], [1, -1]], dtype=np.int8)
+
+    for sq in range(64):
+        r0, c0 = sq >> 3, sq & 7
+        for d in range(4):
+            dr, dc = dirs[d, 0], dirs[d, 1]
+            full = set_bit(np.uint64(0), sq)
+            # Both directions of the axis
+            for sign in (-1, 1):
+                r, c = r0 + sign * dr, c0 + sign * dc
+                while 0 <= r < 8 and 0 <= c < 8:
+                    full = set_bit(full, r * 8 + c)
+                    r += sign * dr
+                    c += sign * dc
+            others = full & ~set_bit(np.uint64(0), sq)
+            while others:
+                b = lsb(others)
+                others = clear_bit(others, b)
+                line[sq, b] = full
+    return line
+
+LINE_BB = _init_line_bb()
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def compute_pinned(state: np.ndarray, color: int, king_sq: int) -> np.uint64:
+    """
+    Bitboard of color's pieces absolutely pinned to their own king.
+
+    For every enemy slider on an open-board ray through the king, the
+    intersection of the king's and the sniper's attack sets (with real
+    occupancy) is exactly the single blocker between them - or empty if
+    there are two or more blockers - so no between-table is needed.
+    """
+    occupied = state[OCCUPIED]
+    own = state[WHITE_OCC] if color == 0 else state[BLACK_OCC]
+    opp_base = 6 if color == 0 else 0
+    pinned = np.uint64(0)
+
+    king_rook_att = rook_attacks(king_sq, occupied)
+    snipers = rook_attacks(king_sq, np.uint64(0)) & (state[opp_base + 3] | state[opp_base + 4])
+    while snipers:
+        s = lsb(snipers)
+        snipers = clear_bit(snipers, s)
+        pinned |= king_rook_att & rook_attacks(s, occupied) & own
+
+    king_bishop_att = bishop_attacks(king_sq, occupied)
+    snipers = bishop_attacks(king_sq, np.uint64(0)) & (state[opp_base + 2] | state[opp_base + 4])
+    while snipers:
+        s = lsb(snipers)
+        snipers = clear_bit(snipers, s)
+        pinned |= king_bishop_att & bishop_attacks(s, occupied) & own
+
+    return pinned
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
 def find_king_square(state: np.ndarray, color: int) -> int:
-    """Find king square for given color."""
+    """Find king square for given color - one bitboard load plus a
+    count-trailing-zeros, so no cached king square is needed."""
     king_idx = WK if color == 0 else BK
     king_bb = state[king_idx]
     if king_bb == 0:
@@ -288,74 +395,182 @@ def find_king_square(state: np.ndarray, color: int) -> int:
     return lsb(king_bb)
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_pseudo_legal_moves_into(state: np.ndarray, color: int,
+                                     moves: np.ndarray) -> int:
+    """
+    Write all pseudo-legal moves (may leave king in check) as packed
+    uint16s into the caller's buffer; returns the count written.
+
+    Each generator threads the running count through, so emission is a
+    plain indexed store - no typed list, no per-move allocation, no
+    copy-out pass afterwards.
+
+    Deliberately serial: a full generation is well under a microsecond
+    and runs inside the search's per-node path, so fanning the square
+    scan out with prange would cost more in thread start-up and the
+    compaction pass than the scan itself. Parallelism in this engine
+    belongs at the root-move level, not here.
+    """
+    n = 0
+    n = generate_pawn_moves(state, color, moves, n, False)
+    n = generate_knight_moves(state, color, moves, n, False)
+    n = generate_slider_moves(state, color, moves, n, False)  # Bishops/rooks/queens
+    n = generate_king_moves(state, color, moves, n, False)
+    return n
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_pseudo_captures_into(state: np.ndarray, color: int,
+                                  moves: np.ndarray) -> int:
+    """
+    Captures-only stage: write pseudo-legal captures, promotions and en
+    passant into the caller's buffer; returns the count written.
+
+    Quiet moves and castling never get emitted, so quiescence no longer
+    generates a full move list only to throw most of it away.
+    """
+    n = 0
+    n = generate_pawn_moves(state, color, moves, n, True)
+    n = generate_knight_moves(state, color, moves, n, True)
+    n = generate_slider_moves(state, color, moves, n, True)
+    n = generate_king_moves(state, color, moves, n, True)
+    return n
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
 def generate_pseudo_legal_moves(state: np.ndarray, color: int) -> np.ndarray:
     """Generate all pseudo-legal moves (may leave king in check)."""
-    moves = List.empty_list(np.uint16)
-    
-    # Generate moves for each piece type
-    generate_pawn_moves(state, color, moves)
-    generate_knight_moves(state, color, moves)
-    generate_sliding_moves(state, color, 2, moves)  # Bishops
-    generate_sliding_moves(state, color, 3, moves)  # Rooks
-    generate_sliding_moves(state, color, 4, moves)  # Queens
-    generate_king_moves(state, color, moves)
-    
-    # Convert to array manually
-    result = np.empty(len(moves), dtype=np.uint16)
-    for i in range(len(moves)):
-        result[i] = moves[i]
-    return result
+    moves = np.empty(MAX_MOVES, dtype=np.uint16)
+    n = generate_pseudo_legal_moves_into(state, color, moves)
+    return moves[:n]
 
 
-@njit(cache=True)
-def is_legal_move(state: np.ndarray, move: np.uint16, color: int) -> bool:
-    """Check if move is legal (doesn't leave king in check)."""
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def is_legal_move(state: np.ndarray, move: np.uint16, color: int,
+                  king_sq: int, undo_buf: np.ndarray) -> bool:
+    """
+    Check if move is legal (doesn't leave king in check).
+
+    king_sq is the pre-move king square for color and undo_buf a scratch
+    int64[UNDO_RECORD_WIDTH] undo slot; both are resolved/allocated once
+    per node by the legal-move filter rather than per candidate move.
+    """
     from_sq, to_sq, flags = decode_move(move)
-    
+
     # Special handling for castling - can't castle through check
     if flags == FLAG_CASTLING_KINGSIDE or flags == FLAG_CASTLING_QUEENSIDE:
-        king_sq = from_sq
         opponent_color = 1 - color
-        
+
         # Can't castle if king is in check
         if is_square_attacked(state, king_sq, opponent_color):
             return False
-        
+
         # Can't castle through attacked square
         direction = 1 if flags == FLAG_CASTLING_KINGSIDE else -1
         through_sq = king_sq + direction
         if is_square_attacked(state, through_sq, opponent_color):
             return False
-    
-    # Make move on copy
-    state_copy = state.copy()
-    undo_info = make_move_numba(state_copy, move)
-    
-    # Check if king is in check
-    king_sq = find_king_square(state_copy, color)
+
+    # King square after the move (king moves carry it to to_sq)
+    if from_sq == king_sq:
+        king_sq = to_sq
+
+    # Make the move in place and unmake it after the check probe - the
+    # undo record restores the state exactly, so no per-move state copy
+    make_move_numba(state, move, undo_buf)
     opponent_color = 1 - color
-    in_check = is_square_attacked(state_copy, king_sq, opponent_color)
-    
-    # No need to unmake on copy
+    in_check = is_square_attacked(state, king_sq, opponent_color)
+    unmake_move_numba(state, move, undo_buf)
+
     return not in_check
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True, boundscheck=False)
+def in_check_numba(state: np.ndarray, color: int) -> bool:
+    """True if color's king is attacked - free-function form of
+    Moves.is_check, callable without constructing the wrapper."""
+    king_sq = find_king_square(state, color)
+    if king_sq < 0:
+        return False
+    return is_square_attacked(state, king_sq, 1 - color)
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _filter_legal_into(state: np.ndarray, color: int,
+                       moves: np.ndarray, n: int) -> int:
+    """
+    Compact the first n pseudo-legal moves down to the legal ones in
+    place and return the new count - the read index always stays ahead
+    of the write index, so one buffer serves both passes. Shared by the
+    full and captures-only entry points.
+    """
+    king_sq = find_king_square(state, color)
+    in_check = is_square_attacked(state, king_sq, 1 - color)
+
+    # When not in check, only king moves, pinned-piece moves and en
+    # passant (possible discovered check along the cleared rank) can be
+    # illegal - everything else skips the make/probe/unmake entirely
+    pinned = np.uint64(0)
+    if not in_check:
+        pinned = compute_pinned(state, color, king_sq)
+
+    undo_buf = np.empty(UNDO_RECORD_WIDTH, dtype=np.int64)
+    m = 0
+    for i in range(n):
+        move = moves[i]
+        from_sq = int(move) & 0x3F
+        to_sq = (int(move) >> 6) & 0x3F
+        flags = (int(move) >> 12) & 0xF
+        if not in_check and from_sq != king_sq and flags != FLAG_EN_PASSANT:
+            if not get_bit(pinned, from_sq):
+                moves[m] = move
+                m += 1
+            elif get_bit(LINE_BB[king_sq, from_sq], to_sq):
+                # A pinned piece staying on the king-pinner line keeps
+                # the pin intact (or captures the pinner) - legal
+                # without the make/probe/unmake
+                moves[m] = move
+                m += 1
+        elif is_legal_move(state, move, color, king_sq, undo_buf):
+            moves[m] = move
+            m += 1
+
+    return m
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_legal_moves_into(state: np.ndarray, color: int,
+                              moves: np.ndarray) -> int:
+    """
+    Generate all legal moves into a caller-supplied uint16[MAX_MOVES]
+    buffer and return the count. Callers that keep a buffer alive (the
+    search holds one per active ply) skip the per-node allocation of
+    the convenience wrapper below.
+    """
+    n = generate_pseudo_legal_moves_into(state, color, moves)
+    return _filter_legal_into(state, color, moves, n)
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def generate_legal_captures_into(state: np.ndarray, color: int,
+                                 moves: np.ndarray) -> int:
+    """
+    Generate only the legal captures, promotions and en passant moves -
+    the set quiescence searches - into a caller-supplied buffer and
+    return the count.
+    """
+    n = generate_pseudo_captures_into(state, color, moves)
+    return _filter_legal_into(state, color, moves, n)
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
 def generate_legal_moves_numba(state: np.ndarray, color: int) -> np.ndarray:
-    """Generate all legal moves (filtered from pseudo-legal)."""
-    pseudo_moves = generate_pseudo_legal_moves(state, color)
-    legal = List.empty_list(np.uint16)
-    
-    for move in pseudo_moves:
-        if is_legal_move(state, move, color):
-            legal.append(move)
-    
-    # Convert to array manually
-    result = np.empty(len(legal), dtype=np.uint16)
-    for i in range(len(legal)):
-        result[i] = legal[i]
-    return result
+    """Generate all legal moves (allocating wrapper around
+    generate_legal_moves_into)."""
+    moves = np.empty(MAX_MOVES, dtype=np.uint16)
+    m = generate_legal_moves_into(state, color, moves)
+    return moves[:m]
 
 
 # ============================================================================
@@ -376,7 +591,11 @@ class Moves:
     def generate(self) -> np.ndarray:
         """
         Generate all legal moves for current side.
-        Returns uint16 array of encoded moves.
+
+        Returns a uint16 array of encoded moves - a slice of the
+        kernel's own buffer, produced without any list building or
+        array conversion. Callers needing zero allocation pass their
+        own buffer to generate_legal_moves_into instead.
         """
         color = unpack_side(self.board.state[META])
         return generate_legal_moves_numba(self.board.state, color)
@@ -386,12 +605,7 @@ class Moves:
         if color is None:
             color = unpack_side(self.board.state[META])
         
-        king_sq = find_king_square(self.board.state, color)
-        if king_sq < 0:
-            return False
-        
-        opponent_color = 1 - color
-        return is_square_attacked(self.board.state, king_sq, opponent_color)
+        return in_check_numba(self.board.state, color)
     
     def is_checkmate(self, color: int = None) -> bool:
         """Check if given color is in checkmate."""
@@ -417,5 +631,6 @@ class Moves:
 
 
 # Export
-__all__ = ['Moves', 'generate_pseudo_legal_moves', 'generate_legal_moves_numba', 
-           'is_square_attacked', 'find_king_square']
+__all__ = ['Moves', 'generate_pseudo_legal_moves', 'generate_legal_moves_numba',
+           'generate_legal_moves_into', 'generate_legal_captures_into',
+           'is_square_attacked', 'find_king_square', 'in_check_numba']
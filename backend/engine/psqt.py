@@ -0,0 +1,138 @@
+"""
+Piece-Square Tables - shared evaluation data.
+
+Lives in its own module (importing nothing from the engine package) so
+both board.py - which maintains the evaluation terms incrementally in
+make/unmake - and evaluation.py can use the tensors without an import
+cycle.
+
+Tensor layout mirrors the state array: row index is the bitboard slot
+(WP..BK = 0..11), black rows are pre-flipped (mirror vertically) and
+pre-negated, and COMBINED_* additionally folds the signed material
+value in, so one int16 load gives a piece's full signed contribution.
+"""
+
+import numpy as np
+
+# Piece values (centipawns) - int16: every value (and its negation)
+# fits, and the eval tables stay half the size in L1
+PIECE_VALUES = np.array([100, 320, 330, 500, 900, 20000], dtype=np.int16)  # P,N,B,R,Q,K
+
+# Piece-Square Tables (from white's perspective, rank 0 = rank 8)
+# Values are bonuses in centipawns
+
+PAWN_TABLE = np.array([
+    [  0,   0,   0,   0,   0,   0,   0,   0],
+    [ 50,  50,  50,  50,  50,  50,  50,  50],
+    [ 10,  10,  20,  30,  30,  20,  10,  10],
+    [  5,   5,  10,  25,  25,  10,   5,   5],
+    [  0,   0,   0,  20,  20,   0,   0,   0],
+    [  5,  -5, -10,   0,   0, -10,  -5,   5],
+    [  5,  10,  10, -20, -20,  10,  10,   5],
+    [  0,   0,   0,   0,   0,   0,   0,   0]
+], dtype=np.int16)
+
+KNIGHT_TABLE = np.array([
+    [-50, -40, -30, -30, -30, -30, -40, -50],
+    [-40, -20,   0,   0,   0,   0, -20, -40],
+    [-30,   0,  10,  15,  15,  10,   0, -30],
+    [-30,   5,  15,  20,  20,  15,   5, -30],
+    [-30,   0,  15,  20,  20,  15,   0, -30],
+    [-30,   5,  10,  15,  15,  10,   5, -30],
+    [-40, -20,   0,   5,   5,   0, -20, -40],
+    [-50, -40, -30, -30, -30, -30, -40, -50]
+], dtype=np.int16)
+
+BISHOP_TABLE = np.array([
+    [-20, -10, -10, -10, -10, -10, -10, -20],
+    [-10,   0,   0,   0,   0,   0,   0, -10],
+    [-10,   0,   5,  10,  10,   5,   0, -10],
+    [-10,   5,   5,  10,  10,   5,   5, -10],
+    [-10,   0,  10,  10,  10,  10,   0, -10],
+    [-10,  10,  10,  10,  10,  10,  10, -10],
+    [-10,   5,   0,   0,   0,   0,   5, -10],
+    [-20, -10, -10, -10, -10, -10, -10, -20]
+], dtype=np.int16)
+
+ROOK_TABLE = np.array([
+    [  0,   0,   0,   0,   0,   0,   0,   0],
+    [  5,  10,  10,  10,  10,  10,  10,   5],
+    [ -5,   0,   0,   0,   0,   0,   0,  -5],
+    [ -5,   0,   0,   0,   0,   0,   0,  -5],
+    [ -5,   0,   0,   0,   0,   0,   0,  -5],
+    [ -5,   0,   0,   0,   0,   0,   0,  -5],
+    [ -5,   0,   0,   0,   0,   0,   0,  -5],
+    [  0,   0,   0,   5,   5,   0,   0,   0]
+], dtype=np.int16)
+
+QUEEN_TABLE = np.array([
+    [-20, -10, -10,  -5,  -5, -10, -10, -20],
+    [-10,   0,   0,   0,   0,   0,   0, -10],
+    [-10,   0,   5,   5,   5,   5,   0, -10],
+    [ -5,   0,   5,   5,   5,   5,   0,  -5],
+    [  0,   0,   5,   5,   5,   5,   0,  -5],
+    [-10,   5,   5,   5,   5,   5,   0, -10],
+    [-10,   0,   5,   0,   0,   0,   0, -10],
+    [-20, -10, -10,  -5,  -5, -10, -10, -20]
+], dtype=np.int16)
+
+KING_MIDDLEGAME_TABLE = np.array([
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-20, -30, -30, -40, -40, -30, -30, -20],
+    [-10, -20, -20, -20, -20, -20, -20, -10],
+    [ 20,  20,   0,   0,   0,   0,  20,  20],
+    [ 20,  30,  10,   0,   0,  10,  30,  20]
+], dtype=np.int16)
+
+KING_ENDGAME_TABLE = np.array([
+    [-50, -40, -30, -20, -20, -30, -40, -50],
+    [-30, -20, -10,   0,   0, -10, -20, -30],
+    [-30, -10,  20,  30,  30,  20, -10, -30],
+    [-30, -10,  30,  40,  40,  30, -10, -30],
+    [-30, -10,  30,  40,  40,  30, -10, -30],
+    [-30, -10,  20,  30,  30,  20, -10, -30],
+    [-30, -30,   0,   0,   0,   0, -30, -30],
+    [-50, -30, -30, -30, -30, -30, -30, -50]
+], dtype=np.int16)
+
+
+def _build_psqt(king_table: np.ndarray) -> np.ndarray:
+    """Stack the six white tables plus their flipped/negated black twins."""
+    white = np.stack([PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE,
+                      ROOK_TABLE, QUEEN_TABLE, king_table])
+    black = -white[:, ::-1, :]
+    return np.ascontiguousarray(
+        np.concatenate((white, black)).reshape(12, 64).astype(np.int16))
+
+PSQT_MID = _build_psqt(KING_MIDDLEGAME_TABLE)
+PSQT_END = _build_psqt(KING_ENDGAME_TABLE)
+
+# Signed material value per state bitboard slot (white +, black -)
+PIECE_VALUES_SIGNED = np.concatenate(
+    (PIECE_VALUES, -PIECE_VALUES)).astype(np.int32)
+
+# Phase-material value per state bitboard slot. Kings are zeroed so the
+# incremental MATERIAL bookkeeping is a plain indexed lookup for any
+# piece index - no per-type conditionals or special cases.
+MATERIAL_VALUES = np.concatenate((PIECE_VALUES, PIECE_VALUES)).astype(np.int16)
+MATERIAL_VALUES[5] = 0   # White king
+MATERIAL_VALUES[11] = 0  # Black king
+
+# Material fused into the PSQT rows: COMBINED[piece_idx, sq] is the full
+# signed contribution of that piece standing on that square, so scoring
+# is one load and one add per occupied square instead of two gathers.
+# Max magnitude is king value + PSQT bonus (~20050), still int16.
+COMBINED_MID = np.ascontiguousarray(
+    (PSQT_MID.astype(np.int32) + PIECE_VALUES_SIGNED[:, None]).astype(np.int16))
+COMBINED_END = np.ascontiguousarray(
+    (PSQT_END.astype(np.int32) + PIECE_VALUES_SIGNED[:, None]).astype(np.int16))
+
+# Flat (768,) views for the hot make/unmake path: indexed as
+# piece_idx * 64 + sq with a single load, same shape convention as the
+# flattened Zobrist keys in board.py. Each 128-byte row starts on an
+# even cache-line boundary of the contiguous block.
+COMBINED_MID_FLAT = np.ascontiguousarray(COMBINED_MID.reshape(-1))
+COMBINED_END_FLAT = np.ascontiguousarray(COMBINED_END.reshape(-1))
@@ -5,17 +5,132 @@ Alpha-beta pruning with transposition table, iterative deepening, and move order
 
 import time
 import numpy as np
-from typing import Optional, Tuple
+from numba import njit
+from typing import Final, Optional, Tuple
 from engine.board import (
     Board, Color, HASH, META,
     decode_move, unpack_side,
     WP, WN, WB, WR, WQ, WK,
     BP, BN, BB, BR, BQ, BK,
+    WHITE_OCC, BLACK_OCC, MAILBOX, FLAG_EN_PASSANT,
 )
-from engine.moves import Moves
+from engine.moves import (MAX_MOVES, generate_legal_moves_numba,
+                          generate_legal_moves_into,
+                          generate_legal_captures_into, in_check_numba)
 from engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
 from engine.evaluation import evaluate
 
+# Piece values for MVV-LVA, module-level so the jitted scoring kernel
+# bakes them in as a compile-time constant. Both colors are laid out so
+# a raw mailbox piece index (0-11) indexes directly - no % 6 per lookup.
+MVV_PIECE_VALUES = np.array([100, 320, 330, 500, 900, 20000] * 2, dtype=np.int32)  # P,N,B,R,Q,K x2
+
+# Move-ordering score tiers. Module-level Final constants, so Numba
+# bakes them into the kernels as immediates instead of global loads.
+TT_MOVE_SCORE: Final = 1_000_000
+CAPTURE_BASE_SCORE: Final = 10_000
+KILLER_SCORE: Final = 2_000
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def _score_one_move(move, mailbox, killer1, killer2, history):
+    """
+    Score a single move against the capture/killer/history tiers.
+
+    Returns (score, history_hit). Every category score is computed
+    unconditionally (the clamped victim index keeps the MVV-LVA gather
+    in bounds for quiets), then merged through conditional expressions -
+    LLVM lowers the chain to selects, so an unpredictable mix of move
+    categories costs no branch mispredictions.
+    """
+    from_sq = move & 0x3F
+    to_sq = (move >> 6) & 0x3F
+
+    # Victim and attacker come straight from the mailbox - one byte
+    # load each instead of scanning six bitboards. Legal moves only
+    # land on empty or enemy squares, so any occupant is a victim.
+    victim = mailbox[to_sq]
+    attacker = mailbox[from_sq]
+
+    is_capture = victim >= 0
+    is_killer = move == killer1 or move == killer2
+
+    capture_score = (CAPTURE_BASE_SCORE + MVV_PIECE_VALUES[max(victim, 0)]
+                     - (MVV_PIECE_VALUES[attacker] // 10))
+    # History heuristic score, keyed by (piece, to-square) - the
+    # mailbox identifies the mover, so color is already encoded
+    history_score = history[attacker * 64 + to_sq]
+
+    score = KILLER_SCORE if is_killer else history_score
+    score = capture_score if is_capture else score
+    hit = int((not is_capture) and (not is_killer) and history_score > 0)
+    return score, hit
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _score_moves_numba(moves, state, tt_move, killer1, killer2, history, scores):
+    """
+    Score every move of a node in one native call.
+
+    The whole per-move loop - decode, capture test, MVV-LVA, killer and
+    history lookups - runs inside a single jitted kernel, so a node pays
+    one Python->Numba crossing instead of one per move. tt_move and the
+    killers are passed as raw uint16 values (0 = none; 0 is never a
+    legal move since it encodes a1->a1). scores is a caller-owned
+    buffer (pooled by Search) with at least len(moves) entries; every
+    used entry is written, so it needs no zeroing.
+
+    Returns history_hits - the hit count is accumulated here so the
+    caller doesn't have to re-scan the scores for stats.
+    """
+    mailbox = state[MAILBOX:].view(np.int8)
+    history_hits = 0
+
+    for i in range(len(moves)):
+        move = moves[i]
+        is_tt = move == tt_move
+        score, hit = _score_one_move(move, mailbox, killer1, killer2, history)
+        scores[i] = TT_MOVE_SCORE if is_tt else score
+        history_hits += hit if not is_tt else 0
+
+    return history_hits
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _score_moves_no_tt_numba(moves, state, killer1, killer2, history, scores):
+    """
+    _score_moves_numba specialized for nodes with no TT move - the
+    per-move tt_move comparison drops out of the loop entirely rather
+    than testing against a sentinel every iteration.
+    """
+    mailbox = state[MAILBOX:].view(np.int8)
+    history_hits = 0
+
+    for i in range(len(moves)):
+        score, hit = _score_one_move(moves[i], mailbox, killer1, killer2, history)
+        scores[i] = score
+        history_hits += hit
+
+    return history_hits
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _next_best_numba(scores) -> int:
+    """
+    Argmax-and-invalidate step for the lazy move picker: return the
+    index of the best remaining score and mark it consumed. One linear
+    scan per picked move - with most nodes cutting off after the first
+    few moves, O(N*k) scans beat a full O(N log N) sort of the tail.
+    """
+    best = 0
+    best_score = scores[0]
+    for i in range(1, len(scores)):
+        if scores[i] > best_score:
+            best_score = scores[i]
+            best = i
+    scores[best] = -2147483648  # INT32_MIN = consumed
+    return best
+
 
 class SearchStats:
     """Statistics tracking for search."""
@@ -35,6 +150,7 @@ class SearchStats:
         self.history_hits = 0
         self.futility_prunes = 0
         self.rfp_prunes = 0
+        self.delta_prunes = 0
         self.start_time = 0.0
         self.depth_reached = 0
     
@@ -50,7 +166,7 @@ class SearchStats:
         return (f"Nodes: {self.nodes:,} | QNodes: {self.qnodes:,} | Depth: {self.depth_reached} | "
                 f"NPS: {self.nps:,.0f} | TT: {self.tt_hits:,} | Cutoffs: {self.cutoffs:,} | "
                 f"Null: {self.null_cutoffs:,} | LMR: {self.lmr_reductions:,}/{self.lmr_researches:,} | "
-                f"Ext: {self.check_extensions:,} | Asp: {self.aspiration_fails:,} | Fut: {self.futility_prunes:,} | RFP: {self.rfp_prunes:,}")
+                f"Ext: {self.check_extensions:,} | Asp: {self.aspiration_fails:,} | Fut: {self.futility_prunes:,} | RFP: {self.rfp_prunes:,} | Delta: {self.delta_prunes:,}")
 
 
 class Search:
@@ -68,7 +184,7 @@ class Search:
     DRAW_SCORE = 0
     
     # Piece values for MVV-LVA (Most Valuable Victim - Least Valuable Attacker)
-    PIECE_VALUES = np.array([100, 320, 330, 500, 900, 20000], dtype=np.int32)  # P,N,B,R,Q,K
+    PIECE_VALUES = MVV_PIECE_VALUES
     
     # Search parameters
     NULL_MOVE_REDUCTION = 2  # R=2 is standard
@@ -83,18 +199,19 @@ class Search:
     ASPIRATION_WINDOW = 50  # Initial window size (in centipawns)
     ASPIRATION_MIN_DEPTH = 3  # Minimum depth to use aspiration windows
     
-    # Futility pruning parameters (margins at frontier nodes)
-    FUTILITY_MARGIN = {
-        1: 200,  # At depth 1, skip if position + 200cp < alpha
-        2: 400,  # At depth 2, skip if position + 400cp < alpha
-    }
+    # Futility pruning margins at frontier nodes, indexed by depth
+    # (tuples, not dicts: the per-node membership test and lookup become
+    # a bounds compare and an indexed load instead of two hash probes).
+    # Index 0 is a sentinel - futility never applies at depth 0.
+    FUTILITY_MARGIN = (0, 200, 400)  # Skip if position + margin < alpha
     
     # Reverse Futility Pruning (Static Null Move) parameters
-    REVERSE_FUTILITY_MARGIN = {
-        1: 200,  # At depth 1, prune if eval - 200cp >= beta
-        2: 300,  # At depth 2, prune if eval - 300cp >= beta
-        3: 500,  # At depth 3, prune if eval - 500cp >= beta
-    }
+    # Quiescence delta pruning margin: a capture is skipped when even
+    # winning its victim plus this safety margin cannot lift alpha
+    DELTA_MARGIN = 200
+
+    # Reverse futility (static null move) margins, same indexing
+    REVERSE_FUTILITY_MARGIN = (0, 200, 300, 500)  # Prune if eval - margin >= beta
     
     def __init__(self, tt_size_mb: int = 64, max_depth: int = 64, use_null_move: bool = True, use_lmr: bool = True, use_aspiration: bool = True, use_futility: bool = True, use_rfp: bool = True):
         """
@@ -110,7 +227,23 @@ class Search:
         self.max_depth = max_depth
         self.stats = SearchStats()
         self.killer_moves = {}  # depth -> [move1, move2]
-        self.history_table = np.zeros((2, 64, 64), dtype=np.int32)  # [color][from][to]
+        # History heuristic, flat (piece, to-square) layout: 3KB of int32
+        # fits in L1 and the mover's color is already in the piece index
+        self.history_table = np.zeros(12 * 64, dtype=np.int32)
+        # Cutoff bonuses are buffered here and applied in one np.add.at
+        # per deepening iteration, so a cutoff pays two scalar stores
+        # instead of a fancy-indexed read-modify-write on the table
+        self._hist_idx_buf = np.empty(4096, dtype=np.intp)
+        self._hist_delta_buf = np.empty(4096, dtype=np.int32)
+        self._hist_n = 0
+        # Free-list of score buffers for _score_moves - recursion means
+        # one buffer per active ply, so a plain depth-indexed array
+        # would collide under check extensions. Buffers are acquired
+        # per node and released after its move loop; the pool allocates
+        # lazily, so steady-state search never touches the allocator.
+        self._score_buf_pool = []
+        # Same free-list scheme for legal-move buffers (uint16[MAX_MOVES])
+        self._move_buf_pool = []
         self.stop_search = False
         self.time_limit = None
         self.use_null_move = use_null_move
@@ -138,9 +271,9 @@ class Search:
         self.time_limit = time_limit
         self.tt.new_search()
         
-        moves_gen = Moves(board)
-        legal_moves = moves_gen.generate()
-        
+        legal_moves = generate_legal_moves_numba(
+            board.state, unpack_side(board.state[META]))
+
         if len(legal_moves) == 0:
             return None, 0
         
@@ -176,7 +309,11 @@ class Search:
             else:
                 # Full window search for shallow depths or after mate score
                 move, score = self._search_root(board, current_depth, legal_moves)
-            
+
+            # Apply this iteration's buffered history bonuses so the next
+            # iteration orders quiets with them
+            self._flush_history()
+
             if move is not None:
                 best_move = move
                 best_score = score
@@ -204,8 +341,10 @@ class Search:
         best_move = None
         best_score = -self.MATE_SCORE
         
-        # Try TT move first
-        tt_entry = self.tt.probe(np.uint64(board.state[HASH]), depth, alpha, beta)
+        # Try TT move first (read the hash once - the root position is the
+        # same for the probe here and the store below)
+        zobrist = np.uint64(board.state[HASH])
+        tt_entry = self.tt.probe(zobrist, depth, alpha, beta)
         tt_move = tt_entry[1] if tt_entry else None
         
         # Order moves
@@ -224,7 +363,7 @@ class Search:
         
         # Store in TT
         if best_move is not None:
-            self.tt.store(np.uint64(board.state[HASH]), best_score, best_move, depth, EXACT)
+            self.tt.store(zobrist, best_score, best_move, depth, EXACT)
         
         return best_move, best_score
     
@@ -233,8 +372,9 @@ class Search:
         best_move = None
         best_score = -self.MATE_SCORE
         
-        # Try TT move first
-        tt_entry = self.tt.probe(np.uint64(board.state[HASH]), depth, alpha, beta)
+        # Try TT move first (hash read once, reused by the store below)
+        zobrist = np.uint64(board.state[HASH])
+        tt_entry = self.tt.probe(zobrist, depth, alpha, beta)
         tt_move = tt_entry[1] if tt_entry else None
         
         # Order moves
@@ -257,7 +397,7 @@ class Search:
         
         # Store in TT (only if we didn't fail high/low)
         if best_move is not None and best_score > alpha:
-            self.tt.store(np.uint64(board.state[HASH]), best_score, best_move, depth, EXACT)
+            self.tt.store(zobrist, best_score, best_move, depth, EXACT)
         
         return best_move, best_score
     
@@ -267,50 +407,64 @@ class Search:
         
         Returns score from current side's perspective.
         """
-        self.stats.nodes += 1
-        
+        # Hot attribute chains bound once per node - this method runs at
+        # full interpreter cost per node, so repeated self/board lookups
+        # are pure dictionary-walk overhead
+        stats = self.stats
+        state = board.state
+        pool = self._move_buf_pool
+
+        stats.nodes += 1
+
         # Check time limit
-        if self.time_limit and self.stats.nodes % 1000 == 0:
-            if (time.time() - self.stats.start_time) >= self.time_limit:
+        if self.time_limit and stats.nodes % 1000 == 0:
+            if (time.time() - stats.start_time) >= self.time_limit:
                 self.stop_search = True
                 return 0
-        
+
         # Probe transposition table
-        zobrist = np.uint64(board.state[HASH])
+        zobrist = np.uint64(state[HASH])
         tt_entry = self.tt.probe(zobrist, depth, alpha, beta)
-        
+
         if tt_entry and tt_entry[0] is not None:
-            self.stats.tt_hits += 1
+            stats.tt_hits += 1
             return tt_entry[0]
         else:
-            self.stats.tt_misses += 1
+            stats.tt_misses += 1
         
         # Terminal depth - enter quiescence search
         if depth <= 0:
             return self._quiescence(board, alpha, beta)
         
-        # Generate moves
-        moves_gen = Moves(board)
-        legal_moves = moves_gen.generate()
-        in_check = moves_gen.is_check()
-        
+        # Generate moves - direct jitted calls, no wrapper object per
+        # node, and the move buffer comes from the pool (one buffer per
+        # active ply; every exit below hands it back)
+        side = unpack_side(state[META])
+        move_buf = (pool.pop() if pool
+                    else np.empty(MAX_MOVES, dtype=np.uint16))
+        n_moves = generate_legal_moves_into(state, side, move_buf)
+        legal_moves = move_buf[:n_moves]
+        in_check = in_check_numba(state, side)
+
         # Checkmate or stalemate
-        if len(legal_moves) == 0:
+        if n_moves == 0:
+            pool.append(move_buf)
             if in_check:
                 return -self.MATE_SCORE + (self.max_depth - depth)  # Mate in N plies
             else:
                 return self.DRAW_SCORE  # Stalemate
-        
+
         # Reverse Futility Pruning (Static Null Move)
         # If position is so good that even with a margin, eval >= beta, prune
         if (self.use_rfp and
-            depth in self.REVERSE_FUTILITY_MARGIN and
+            0 < depth < len(self.REVERSE_FUTILITY_MARGIN) and
             not in_check and
             abs(beta) < self.MATE_SCORE - 100):
-            
-            static_eval = self._evaluate(board)
+
+            static_eval = evaluate(state)
             if static_eval - self.REVERSE_FUTILITY_MARGIN[depth] >= beta:
-                self.stats.rfp_prunes += 1
+                stats.rfp_prunes += 1
+                pool.append(move_buf)
                 return static_eval
         
         # Null move pruning (only if not in check and not already in null move)
@@ -333,26 +487,30 @@ class Search:
             
             # If null move fails high, we can prune (opponent can do better than our best)
             if score >= beta:
-                self.stats.null_cutoffs += 1
+                stats.null_cutoffs += 1
+                pool.append(move_buf)
                 return beta
         
-        # Order moves
+        # Score moves once; the lazy picker below selects them best-first
+        # on demand, so the tail after a cutoff is never sorted
         tt_move = tt_entry[1] if tt_entry else None
-        ordered_moves = self._order_moves(board, legal_moves, depth, tt_move)
-        
+        move_scores = self._score_moves(board, legal_moves, depth, tt_move)
+
         best_score = -self.MATE_SCORE
         best_move = None
         moves_searched = 0
         
         # Futility pruning - evaluate position for frontier nodes
         futility_base = None
-        if (self.use_futility and 
-            depth in self.FUTILITY_MARGIN and 
-            not in_check and 
+        if (self.use_futility and
+            0 < depth < len(self.FUTILITY_MARGIN) and
+            not in_check and
             abs(alpha) < self.MATE_SCORE - 100):
-            futility_base = self._evaluate(board)
+            futility_base = evaluate(state)
         
-        for move in ordered_moves:
+        for _ in range(len(legal_moves)):
+            move = legal_moves[_next_best_numba(move_scores)]
+
             # Check if this move is a capture (before making the move)
             is_capture = self._is_capture(move, board)
             
@@ -361,14 +519,13 @@ class Search:
                 not is_capture and 
                 moves_searched > 0 and  # Don't prune the first move
                 futility_base + self.FUTILITY_MARGIN[depth] <= alpha):
-                self.stats.futility_prunes += 1
+                stats.futility_prunes += 1
                 continue
             
             undo = board.make_move(move)
             
             # Check if we're in check after the move (opponent in check)
-            moves_gen_new = Moves(board)
-            gives_check = moves_gen_new.is_check()
+            gives_check = in_check_numba(state, unpack_side(state[META]))
             
             # Determine new depth (with extensions/reductions)
             new_depth = depth - 1
@@ -376,7 +533,7 @@ class Search:
             # Check extension - search deeper when giving check
             if gives_check:
                 new_depth += 1
-                self.stats.check_extensions += 1
+                stats.check_extensions += 1
             
             # Late Move Reduction (LMR)
             # Reduce depth for moves searched late in the list (likely bad)
@@ -389,12 +546,12 @@ class Search:
                 not is_capture):  # Don't reduce captures
                 
                 # Search with reduced depth
-                self.stats.lmr_reductions += 1
+                stats.lmr_reductions += 1
                 score = -self._negamax(board, new_depth - self.LMR_REDUCTION, -alpha - 1, -alpha)
                 
                 # If reduced search fails high, do full search
                 if score > alpha:
-                    self.stats.lmr_researches += 1
+                    stats.lmr_researches += 1
                     score = -self._negamax(board, new_depth, -beta, -alpha)
                     do_full_search = False
                 else:
@@ -412,22 +569,34 @@ class Search:
                 best_move = move
             
             alpha = max(alpha, score)
-            
-            # Beta cutoff
+
+            # Beta cutoff - on equality too: a score matching beta
+            # already refutes this line, and cutting only on strictly
+            # greater scores would search many extra nodes for nothing
             if alpha >= beta:
-                self.stats.cutoffs += 1
+                stats.cutoffs += 1
                 
                 # Update history heuristic for quiet moves (not captures)
                 if not is_capture:
-                    side = unpack_side(board.state[META])
-                    from_sq = move & 0x3F
-                    to_sq = (move >> 6) & 0x3F
-                    # Bonus = depth^2 (deeper searches get higher priority)
-                    self.history_table[side, from_sq, to_sq] += depth * depth
+                    from_sq = int(move) & 0x3F
+                    to_sq = (int(move) >> 6) & 0x3F
+                    # The move is already unmade here, so the mailbox has
+                    # the mover back on its from-square
+                    piece_idx = int(state[MAILBOX:].view(np.int8)[from_sq])
+                    # Bonus = depth^2 (deeper searches get higher priority),
+                    # buffered and applied in bulk by _flush_history
+                    if self._hist_n == len(self._hist_idx_buf):
+                        self._flush_history()
+                    self._hist_idx_buf[self._hist_n] = piece_idx * 64 + to_sq
+                    self._hist_delta_buf[self._hist_n] = depth * depth
+                    self._hist_n += 1
                     self._store_killer(move, depth)
                 
                 break
-        
+
+        self._release_scores(move_scores)
+        pool.append(move_buf)
+
         # Store in transposition table
         if best_move is not None:
             bound = EXACT if alpha < beta else LOWER_BOUND
@@ -435,28 +604,26 @@ class Search:
         
         return best_score
     
-    def _evaluate(self, board: Board) -> int:
-        """
-        Evaluate position using piece-square tables.
-        Returns score from current side's perspective.
-        """
-        return evaluate(board.state)
-    
     def _quiescence(self, board: Board, alpha: int, beta: int) -> int:
         """
         Quiescence search - search only captures to avoid horizon effect.
         This prevents the engine from missing tactical shots.
         """
-        self.stats.qnodes += 1
-        
+        # Same per-node attribute binding as _negamax
+        stats = self.stats
+        state = board.state
+        pool = self._move_buf_pool
+
+        stats.qnodes += 1
+
         # Check time limit periodically
-        if self.time_limit and self.stats.qnodes % 1000 == 0:
-            if (time.time() - self.stats.start_time) >= self.time_limit:
+        if self.time_limit and stats.qnodes % 1000 == 0:
+            if (time.time() - stats.start_time) >= self.time_limit:
                 self.stop_search = True
                 return 0
-        
+
         # Stand pat score (what if we don't capture anything?)
-        stand_pat = self._evaluate(board)
+        stand_pat = evaluate(state)
         
         # Beta cutoff - position is already too good
         if stand_pat >= beta:
@@ -472,167 +639,161 @@ class Search:
         if stand_pat < alpha - BIG_DELTA:
             return alpha
         
-        # Generate and search only captures
-        moves_gen = Moves(board)
-        captures = self._get_captures(board, moves_gen.generate())
-        
-        if len(captures) == 0:
+        # Captures-only generation: the kernel emits just captures,
+        # promotions and en passant, so quiet moves are never generated
+        # only to be filtered back out here
+        move_buf = (pool.pop() if pool
+                    else np.empty(MAX_MOVES, dtype=np.uint16))
+        n_moves = generate_legal_captures_into(
+            state, unpack_side(state[META]), move_buf)
+
+        if n_moves == 0:
+            pool.append(move_buf)
             return stand_pat
-        
-        # Order captures by MVV-LVA
-        captures = self._order_captures(board, captures)
-        
-        for move in captures:
+
+        # Order captures by MVV-LVA; the victim values come back from
+        # the same gather so delta pruning doesn't re-read the mailbox.
+        # The argsort gather copies, so the pooled buffer goes straight back
+        captures, victim_values = self._order_captures(board, move_buf[:n_moves])
+        pool.append(move_buf)
+
+        for i in range(len(captures)):
+            move = captures[i]
+            # Per-capture delta pruning: if even winning this victim plus
+            # a margin cannot lift alpha, the search below is pointless.
+            # Promotions are exempt - the victim value understates them.
+            flags = (move >> 12) & 0xF
+            if (flags == 0 and
+                stand_pat + int(victim_values[i]) + self.DELTA_MARGIN <= alpha):
+                stats.delta_prunes += 1
+                continue
+
             undo = board.make_move(move)
             score = -self._quiescence(board, -beta, -alpha)
             board.unmake_move(move, undo)
-            
+
             if score >= beta:
                 return beta
             if score > alpha:
                 alpha = score
-        
+
         return alpha
-    
-    def _get_captures(self, board: Board, moves: np.ndarray) -> np.ndarray:
-        """Filter only capture moves."""
-        if len(moves) == 0:
-            return moves
-        
-        side = unpack_side(board.state[META])
-        opponent_start = BP if side == 0 else WP
-        
-        captures = []
-        for move in moves:
-            to_sq = (move >> 6) & 0x3F
-            
-            # Check if destination is occupied by opponent
-            is_capture = False
-            for piece_idx in range(6):
-                if board.state[opponent_start + piece_idx] & (np.uint64(1) << to_sq):
-                    is_capture = True
-                    break
-            
-            # Also include en passant captures
-            flags = (move >> 12) & 0xF
-            if flags == 5:  # EP_CAPTURE flag
-                is_capture = True
-            
-            if is_capture:
-                captures.append(move)
-        
-        return np.array(captures, dtype=np.uint16)
-    
-    def _order_captures(self, board: Board, captures: np.ndarray) -> np.ndarray:
-        """Order captures by MVV-LVA."""
-        if len(captures) <= 1:
-            return captures
-        
-        scores = np.zeros(len(captures), dtype=np.int32)
-        side = unpack_side(board.state[META])
-        opponent_start = BP if side == 0 else WP
-        piece_start = WP if side == 0 else BP
-        
-        for i, move in enumerate(captures):
-            from_sq = move & 0x3F
-            to_sq = (move >> 6) & 0x3F
-            
-            # Find captured piece value
-            captured_value = 100  # Default (en passant pawn)
-            for piece_idx in range(6):
-                if board.state[opponent_start + piece_idx] & (np.uint64(1) << to_sq):
-                    captured_value = int(self.PIECE_VALUES[piece_idx])
-                    break
-            
-            # Find moving piece value
-            moving_value = 100  # Default pawn
-            for piece_idx in range(6):
-                if board.state[piece_start + piece_idx] & (np.uint64(1) << from_sq):
-                    moving_value = int(self.PIECE_VALUES[piece_idx])
-                    break
-            
-            # MVV-LVA score
-            scores[i] = captured_value * 10 - moving_value
-        
-        sorted_indices = np.argsort(-scores)
-        return captures[sorted_indices]
+
+    def _order_captures(self, board: Board, captures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Order captures by MVV-LVA.
+
+        Returns (ordered captures, victim values in the same order) so
+        the quiescence loop's delta pruning reuses the victim gather
+        done here instead of classifying each move a second time.
+        """
+        # Victim/attacker arrays come from one fancy-indexed mailbox
+        # gather each; the MVV-LVA assembly is then pure ufunc work
+        mailbox = board.state[MAILBOX:].view(np.int8)
+        froms = (captures & np.uint16(0x3F)).astype(np.intp)
+        tos = ((captures >> np.uint16(6)) & np.uint16(0x3F)).astype(np.intp)
+        victims = mailbox[tos]
+        attackers = mailbox[froms]
+
+        # Empty target = en passant or quiet promotion, scored as a pawn
+        # (understating promotions is fine - delta pruning exempts them;
+        # the maximum clamps the -1 empty marker to a valid index)
+        captured_value = np.where(victims >= 0, self.PIECE_VALUES[np.maximum(victims, 0)], 100)
+        moving_value = self.PIECE_VALUES[attackers]
+        scores = captured_value * 10 - moving_value
+
+        order = np.argsort(scores)[::-1]
+        return captures[order], captured_value[order]
     
     def _is_capture(self, move: np.uint16, board: Board) -> bool:
         """Check if a move is a capture."""
-        to_sq = (move >> 6) & 0x3F
+        to_sq = (int(move) >> 6) & 0x3F
         side = unpack_side(board.state[META])
-        opponent_start = BP if side == 0 else WP
-        
-        # Check if destination is occupied by opponent
-        for piece_idx in range(6):
-            if board.state[opponent_start + piece_idx] & (np.uint64(1) << to_sq):
-                return True
-        
+
+        # One occupancy test instead of scanning six piece boards
+        opp_occ = int(board.state[BLACK_OCC if side == 0 else WHITE_OCC])
+        if (opp_occ >> to_sq) & 1:
+            return True
+
         # Check for en passant
-        flags = (move >> 12) & 0xF
-        if flags == 5:  # EP_CAPTURE
+        flags = (int(move) >> 12) & 0xF
+        if flags == FLAG_EN_PASSANT:
             return True
-        
+
         return False
     
-    def _order_moves(self, board: Board, moves: np.ndarray, depth: int, tt_move: Optional[np.uint16]) -> np.ndarray:
+    def _flush_history(self) -> None:
         """
-        Order moves for better alpha-beta pruning.
-        
+        Apply buffered cutoff bonuses to the history table in bulk.
+
+        np.add.at accumulates repeated (piece, to-square) indices
+        correctly. Afterwards one aging pass halves the whole table when
+        the top score passes 10,000, keeping values well inside int32
+        and letting stale history decay between iterations.
+        """
+        if self._hist_n:
+            np.add.at(self.history_table,
+                      self._hist_idx_buf[:self._hist_n],
+                      self._hist_delta_buf[:self._hist_n])
+            self._hist_n = 0
+        if self.history_table.max() > 10_000:
+            self.history_table //= 2
+
+    def _score_moves(self, board: Board, moves: np.ndarray, depth: int, tt_move: Optional[np.uint16]) -> np.ndarray:
+        """
+        Score moves for ordering.
+
         Priority:
         1. TT move (from transposition table)
         2. Captures (MVV-LVA)
         3. Killer moves
         4. Other moves
+
+        Returns the raw score array - a slice of a pooled buffer;
+        callers either sort it (root) or feed it to the lazy picker
+        (_next_best_numba), then hand it back via _release_scores so
+        only the moves actually searched before a cutoff pay selection
+        cost and no per-node allocation happens.
+        """
+        # Flatten the TT move and killers to raw uint16s (0 = none) and
+        # score the whole move list in one jitted call
+        killers = self.killer_moves.get(depth)
+        killer1 = np.uint16(killers[0]) if killers else np.uint16(0)
+        killer2 = np.uint16(killers[1]) if killers and len(killers) > 1 else np.uint16(0)
+
+        pool = self._score_buf_pool
+        buf = pool.pop() if pool else np.empty(MAX_MOVES, dtype=np.int32)
+
+        # Dispatch on tt_move once here instead of comparing against a
+        # sentinel on every move inside the kernel
+        if tt_move is None:
+            history_hits = _score_moves_no_tt_numba(
+                moves, board.state, killer1, killer2, self.history_table, buf)
+        else:
+            history_hits = _score_moves_numba(
+                moves, board.state, np.uint16(tt_move), killer1, killer2,
+                self.history_table, buf)
+        self.stats.history_hits += history_hits
+        return buf[:len(moves)]
+
+    def _release_scores(self, scores: np.ndarray) -> None:
+        """Return a _score_moves buffer (via its base array) to the pool."""
+        self._score_buf_pool.append(scores.base)
+
+    def _order_moves(self, board: Board, moves: np.ndarray, depth: int, tt_move: Optional[np.uint16]) -> np.ndarray:
+        """
+        Fully sorted move list - used at the root, where every move is
+        searched anyway so a complete sort costs nothing extra.
         """
         if len(moves) <= 1:
             return moves
-        
-        scores = np.zeros(len(moves), dtype=np.int32)
-        
-        for i, move in enumerate(moves):
-            # TT move gets highest priority
-            if tt_move is not None and move == tt_move:
-                scores[i] = 1000000
-                continue
-            
-            # Decode move
-            from_sq, to_sq, flags = move & 0x3F, (move >> 6) & 0x3F, (move >> 12) & 0xF
-            
-            # Check if capture (destination square occupied by opponent)
-            side = unpack_side(board.state[META])
-            opponent_start = BP if side == 0 else WP
-            
-            captured_value = 0
-            for piece_idx in range(6):
-                if board.state[opponent_start + piece_idx] & (np.uint64(1) << to_sq):
-                    captured_value = self.PIECE_VALUES[piece_idx]
-                    break
-            
-            if captured_value > 0:
-                # MVV-LVA: prefer capturing valuable pieces with cheap pieces
-                # Find moving piece value
-                piece_start = WP if side == 0 else BP
-                moving_value = 100  # default pawn
-                for piece_idx in range(6):
-                    if board.state[piece_start + piece_idx] & (np.uint64(1) << from_sq):
-                        moving_value = self.PIECE_VALUES[piece_idx]
-                        break
-                
-                scores[i] = 10000 + captured_value - (moving_value // 10)
-            else:
-                # Quiet moves: killers > history heuristic
-                if depth in self.killer_moves and move in self.killer_moves[depth]:
-                    scores[i] = 2000
-                else:
-                    # History heuristic score
-                    history_score = self.history_table[side, from_sq, to_sq]
-                    scores[i] = history_score
-                    if history_score > 0:
-                        self.stats.history_hits += 1
-        
-        # Sort moves by score (descending)
-        sorted_indices = np.argsort(-scores)
+
+        scores = self._score_moves(board, moves, depth, tt_move)
+
+        # Sort moves by score (descending); reversing an ascending
+        # argsort avoids materializing a negated copy of the scores
+        sorted_indices = np.argsort(scores)[::-1]
+        self._release_scores(scores)
         return moves[sorted_indices]
     
     def _store_killer(self, move: np.uint16, depth: int):
@@ -658,7 +819,7 @@ class Search:
         """
         pv = []
         seen_positions = set()
-        temp_board = Board(fen=board.to_fen())
+        temp_board = board.copy()
         
         for _ in range(max_depth):
             # Get hash
@@ -677,19 +838,20 @@ class Search:
             move = tt_entry[1]
             
             # Verify move is legal
-            moves_gen = Moves(temp_board)
-            legal_moves = moves_gen.generate()
+            legal_moves = generate_legal_moves_numba(
+                temp_board.state, unpack_side(temp_board.state[META]))
             if move not in legal_moves:
                 break
-            
+
             pv.append(move)
-            
+
             # Make move on temporary board
             undo = temp_board.make_move(move)
-            
+
             # If checkmate, stop
-            moves_gen_new = Moves(temp_board)
-            if len(moves_gen_new.generate()) == 0:
+            legal_moves = generate_legal_moves_numba(
+                temp_board.state, unpack_side(temp_board.state[META]))
+            if len(legal_moves) == 0:
                 break
         
         return pv
@@ -709,12 +871,15 @@ class Search:
             return ""
         
         moves_str = []
-        temp_board = Board(fen=board.to_fen())
+        temp_board = board.copy()
         
         for move in pv:
-            from_sq, to_sq, flags = decode_move(move)
-            from_notation = chr(ord('a') + (from_sq % 8)) + str(from_sq // 8 + 1)
-            to_notation = chr(ord('a') + (to_sq % 8)) + str(to_sq // 8 + 1)
+            # Branchless bit-field extraction - no jit call, no divmod
+            # (square 0 = a8, so rank is 8 - row)
+            from_sq = move & 0x3F
+            to_sq = (move >> 6) & 0x3F
+            from_notation = chr(ord('a') + (from_sq & 7)) + str(8 - (from_sq >> 3))
+            to_notation = chr(ord('a') + (to_sq & 7)) + str(8 - (to_sq >> 3))
             moves_str.append(f"{from_notation}{to_notation}")
             
             # Make move for next iteration
@@ -3,6 +3,11 @@ Piece-Square Tables for position evaluation.
 
 Pre-computed bonuses for piece placement (Stockfish-inspired values).
 Run save_pst_tables() to regenerate or tune values.
+
+NOTE: this is the offline .npy generation toolkit only. The live
+evaluator does NOT read these files - it uses the tensors defined in
+engine/psqt.py (which board.py also uses for its incremental eval
+bookkeeping). Tune there, not here.
 """
 
 import numpy as np
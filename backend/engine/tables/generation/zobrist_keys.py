@@ -116,3 +116,10 @@ def get_zobrist_side_to_move():
     """Get Zobrist side to move key (lazy loaded)."""
     _ensure_loaded()
     return ZOBRIST_SIDE_TO_MOVE
+
+
+# Load eagerly at import: the package docstring promises auto-loaded
+# tables, and doing it here keeps the None-check out of hot paths and
+# removes the first-access race under threaded search. The get_* wrappers
+# stay as the public API; after this line they are plain reads.
+load_zobrist_keys()
@@ -20,6 +20,8 @@ Usage:
     result = tt.probe(zobrist, depth, alpha, beta)
 """
 
+import sys
+
 import numpy as np
 from numba import njit
 from typing import Optional, Tuple
@@ -31,57 +33,52 @@ LOWER_BOUND = 1  # Beta cutoff (score >= beta)
 UPPER_BOUND = 2  # Alpha cutoff (score <= alpha)
 
 
-# Transposition table entry structure (packed into numpy arrays for speed)
-# Each entry: [hash_key, score, best_move, depth, node_type, age]
-# Using structured arrays for cache efficiency
+# Entry layout: two uint64 words per entry, 16 bytes total, so a
+# 64-byte cache line holds a whole 4-entry bucket and a probe touches
+# exactly one line (the old per-field arrays spread every probe over
+# six lines).
+#   word 0: Zobrist key (0 = empty)
+#   word 1: score+32768 (16) | move (16) | depth (8) | node_type (8) | age (8)
+TT_BUCKET = 4  # Entries per bucket = entries per cache line
 
 
 class TranspositionTable:
     """
     Hash table for caching position evaluations.
-    
-    Uses Zobrist hashing with replacement scheme based on depth and age.
+
+    Uses Zobrist hashing with 4-way cache-line buckets; within a bucket
+    the shallowest (oldest-search-first) entry is replaced.
     """
-    
+
     def __init__(self, size_mb: int = 128):
         """
         Initialize transposition table.
-        
+
         Args:
             size_mb: Size in megabytes (default 128MB)
         """
-        # Each entry: 8 bytes (hash) + 2 (score) + 2 (move) + 1 (depth) + 1 (type) + 1 (age) = 15 bytes
-        # Round up to 16 bytes for alignment
         bytes_per_entry = 16
         self.size = (size_mb * 1024 * 1024) // bytes_per_entry
-        
+
         # Make size a power of 2 for fast modulo (use bitwise AND instead)
         self.size = 1 << (self.size.bit_length() - 1)
         self.mask = self.size - 1
-        
-        # Separate arrays for each field (better cache locality)
-        self.hash_keys = np.zeros(self.size, dtype=np.uint64)
-        self.scores = np.zeros(self.size, dtype=np.int16)
-        self.best_moves = np.zeros(self.size, dtype=np.uint16)
-        self.depths = np.zeros(self.size, dtype=np.int8)
-        self.node_types = np.zeros(self.size, dtype=np.uint8)
-        self.ages = np.zeros(self.size, dtype=np.uint8)
-        
+
+        # One packed (size, 2) uint64 array - C-contiguous, so bucket
+        # base i*16 bytes is naturally cache-line aligned every 4 entries
+        self.entries = np.zeros((self.size, 2), dtype=np.uint64)
+
         self.current_age = 0
         self.hits = 0
         self.collisions = 0
         self.stores = 0
-        
-        print(f"[TT] Initialized {self.size:,} entries ({size_mb}MB)")
-    
+
+        # stderr: stdout belongs to the UCI protocol when run as an engine
+        print(f"[TT] Initialized {self.size:,} entries ({size_mb}MB)", file=sys.stderr)
+
     def clear(self):
         """Clear all entries."""
-        self.hash_keys.fill(0)
-        self.scores.fill(0)
-        self.best_moves.fill(0)
-        self.depths.fill(0)
-        self.node_types.fill(0)
-        self.ages.fill(0)
+        self.entries.fill(0)
         self.hits = 0
         self.collisions = 0
         self.stores = 0
@@ -103,31 +100,22 @@ class TranspositionTable:
         Returns:
             (score, best_move) if found and usable, None otherwise
         """
-        index = int(zobrist & self.mask)
-        
-        if self.hash_keys[index] == zobrist:
-            # Hash match - check if depth is sufficient
-            stored_depth = self.depths[index]
-            if stored_depth >= depth:
-                self.hits += 1
-                score = int(self.scores[index])
-                node_type = self.node_types[index]
-                best_move = self.best_moves[index]
-                
-                # Check if score is usable based on node type
-                if node_type == EXACT:
-                    return (score, best_move)
-                elif node_type == LOWER_BOUND and score >= beta:
-                    return (score, best_move)
-                elif node_type == UPPER_BOUND and score <= alpha:
-                    return (score, best_move)
-                
-                # Can't use score, but can use move for move ordering
-                return (None, best_move) if best_move != 0 else None
-            else:
-                # Collision - hash matches but depth too shallow
-                self.collisions += 1
-        
+        # All field reads and bound checks happen inside the jitted
+        # kernel - one native call per probe instead of six interpreted
+        # array accesses
+        status, score, best_move = tt_probe_fast(
+            self.entries, np.uint64(zobrist), self.mask, depth, alpha, beta)
+
+        if status == TT_HIT:
+            self.hits += 1
+            return (score, best_move)
+        if status == TT_MOVE_ONLY:
+            # Can't use score, but can use move for move ordering
+            self.hits += 1
+            return (None, best_move) if best_move != 0 else None
+        if status == TT_SHALLOW:
+            # Hash matches but depth too shallow
+            self.collisions += 1
         return None
     
     def store(self, zobrist: np.uint64, score: int, best_move: np.uint16, 
@@ -142,33 +130,12 @@ class TranspositionTable:
             depth: Search depth
             node_type: EXACT, LOWER_BOUND, or UPPER_BOUND
         """
-        index = int(zobrist & self.mask)
-        
-        # Replacement scheme: always replace if:
-        # 1. Empty slot (hash == 0)
-        # 2. Same position (hash matches)
-        # 3. Older entry (age differs and depth not significantly deeper)
-        # 4. Shallower depth
-        
-        stored_hash = self.hash_keys[index]
-        if stored_hash == 0 or stored_hash == zobrist:
-            # Empty or same position - always replace
-            replace = True
-        else:
-            # Check replacement criteria
-            stored_depth = self.depths[index]
-            stored_age = self.ages[index]
-            
-            # Replace if: new depth >= stored depth OR different age
-            replace = (depth >= stored_depth) or (stored_age != self.current_age)
-        
-        if replace:
-            self.hash_keys[index] = zobrist
-            self.scores[index] = np.int16(score)
-            self.best_moves[index] = best_move
-            self.depths[index] = np.int8(depth)
-            self.node_types[index] = np.uint8(node_type)
-            self.ages[index] = np.uint8(self.current_age)
+        # Replacement decision and field writes all happen in the jitted
+        # kernel; it reports whether the entry was written so the stores
+        # counter stays accurate
+        if tt_store_fast(self.entries, np.uint64(zobrist), self.mask, score,
+                         np.uint16(best_move), depth, node_type,
+                         self.current_age):
             self.stores += 1
     
     def get_stats(self) -> dict:
@@ -177,7 +144,7 @@ class TranspositionTable:
         hit_rate = (self.hits / total_probes * 100) if total_probes > 0 else 0
         
         # Count filled entries
-        filled = np.count_nonzero(self.hash_keys)
+        filled = np.count_nonzero(self.entries[:, 0])
         fill_rate = filled / self.size * 100
         
         return {
@@ -197,61 +164,91 @@ class TranspositionTable:
                 f"{stats['hit_rate']:.1f}% hit rate)")
 
 
+# Probe outcome codes shared between the jitted kernel and the wrapper
+TT_MISS = 0       # No entry for this position
+TT_SHALLOW = 1    # Hash matches but stored depth is insufficient
+TT_MOVE_ONLY = 2  # Depth sufficient but bound unusable - move for ordering
+TT_HIT = 3        # Score usable as-is
+
+
 # Optimized probe function (can be called from Numba JIT code)
-@njit(cache=True, inline='always')
-def tt_probe_fast(hash_keys: np.ndarray, scores: np.ndarray, best_moves: np.ndarray,
-                  depths: np.ndarray, node_types: np.ndarray,
-                  zobrist: np.uint64, mask: int, depth: int, 
-                  alpha: int, beta: int) -> Tuple[bool, int, np.uint16]:
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def tt_probe_fast(entries: np.ndarray, zobrist: np.uint64, mask: int,
+                  depth: int, alpha: int, beta: int) -> Tuple[int, int, np.uint16]:
     """
     Fast transposition table probe (JIT-compiled).
-    
+
+    Scans the position's 4-entry bucket - all sixteen words live in one
+    cache line, so the whole scan costs a single memory access.
+
     Returns:
-        (found, score, best_move)
+        (status, score, best_move) with status one of the TT_* codes
     """
-    index = int(zobrist & mask)
-    
-    if hash_keys[index] == zobrist and depths[index] >= depth:
-        score = int(scores[index])
-        node_type = node_types[index]
-        best_move = best_moves[index]
-        
-        if node_type == EXACT:
-            return (True, score, best_move)
-        elif node_type == LOWER_BOUND and score >= beta:
-            return (True, score, best_move)
-        elif node_type == UPPER_BOUND and score <= alpha:
-            return (True, score, best_move)
-        
-        # Can use move but not score
-        if best_move != 0:
-            return (False, 0, best_move)
-    
-    return (False, 0, np.uint16(0))
+    base = int(zobrist & np.uint64(mask)) & ~(TT_BUCKET - 1)
 
+    for i in range(base, base + TT_BUCKET):
+        if entries[i, 0] == zobrist:
+            data = entries[i, 1]
+            best_move = np.uint16((data >> np.uint64(16)) & np.uint64(0xFFFF))
+            stored_depth = int((data >> np.uint64(32)) & np.uint64(0xFF))
+            if stored_depth >= depth:
+                score = int(data & np.uint64(0xFFFF)) - 32768
+                node_type = int((data >> np.uint64(40)) & np.uint64(0xFF))
 
-@njit(cache=True, inline='always')
-def tt_store_fast(hash_keys: np.ndarray, scores: np.ndarray, best_moves: np.ndarray,
-                  depths: np.ndarray, node_types: np.ndarray, ages: np.ndarray,
-                  zobrist: np.uint64, mask: int, score: int, best_move: np.uint16,
-                  depth: int, node_type: int, current_age: int):
+                if node_type == EXACT:
+                    return (TT_HIT, score, best_move)
+                elif node_type == LOWER_BOUND and score >= beta:
+                    return (TT_HIT, score, best_move)
+                elif node_type == UPPER_BOUND and score <= alpha:
+                    return (TT_HIT, score, best_move)
+
+                # Can use move but not score
+                return (TT_MOVE_ONLY, 0, best_move)
+            return (TT_SHALLOW, 0, best_move)
+
+    return (TT_MISS, 0, np.uint16(0))
+
+
+@njit(cache=True, nogil=True, boundscheck=False, inline='always')
+def tt_store_fast(entries: np.ndarray, zobrist: np.uint64, mask: int,
+                  score: int, best_move: np.uint16,
+                  depth: int, node_type: int, current_age: int) -> bool:
     """
     Fast transposition table store (JIT-compiled).
+    Returns True if the entry was written (replacement policy accepted it).
+
+    Victim selection within the bucket: the position's own entry if
+    present, else an empty slot, else the shallowest entry (entries from
+    older searches count as depth -1 so they go first). The new entry
+    always displaces the victim unless the victim is a fresh, deeper
+    entry for a different position.
     """
-    index = int(zobrist & mask)
-    
-    stored_hash = hash_keys[index]
-    if stored_hash == 0 or stored_hash == zobrist:
-        replace = True
-    else:
-        stored_depth = depths[index]
-        stored_age = ages[index]
-        replace = (depth >= stored_depth) or (stored_age != current_age)
-    
-    if replace:
-        hash_keys[index] = zobrist
-        scores[index] = np.int16(score)
-        best_moves[index] = best_move
-        depths[index] = np.int8(depth)
-        node_types[index] = np.uint8(node_type)
-        ages[index] = np.uint8(current_age)
+    base = int(zobrist & np.uint64(mask)) & ~(TT_BUCKET - 1)
+
+    victim = base
+    victim_depth = 256
+    for i in range(base, base + TT_BUCKET):
+        key = entries[i, 0]
+        if key == 0 or key == zobrist:
+            victim = i
+            victim_depth = -1
+            break
+        data = entries[i, 1]
+        stored_depth = int((data >> np.uint64(32)) & np.uint64(0xFF))
+        stored_age = int((data >> np.uint64(48)) & np.uint64(0xFF))
+        if stored_age != current_age:
+            stored_depth = -1
+        if stored_depth < victim_depth:
+            victim_depth = stored_depth
+            victim = i
+
+    if depth < victim_depth:
+        return False
+
+    entries[victim, 0] = zobrist
+    entries[victim, 1] = (np.uint64(score + 32768) |
+                          (np.uint64(best_move) << np.uint64(16)) |
+                          (np.uint64(depth) << np.uint64(32)) |
+                          (np.uint64(node_type) << np.uint64(40)) |
+                          (np.uint64(current_age) << np.uint64(48)))
+    return True
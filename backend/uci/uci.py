@@ -10,11 +10,26 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from engine.board import Board
+import engine
+from engine.board import (
+    Board,
+    FLAG_PROMOTION_QUEEN, FLAG_PROMOTION_ROOK,
+    FLAG_PROMOTION_BISHOP, FLAG_PROMOTION_KNIGHT,
+)
 from engine.search import Search
 from engine.moves import Moves
 
 
+# UCI promotion char <-> move-flag mapping (uint16 encoding, bits 12-15)
+PROMO_FLAGS = {
+    'q': FLAG_PROMOTION_QUEEN,
+    'r': FLAG_PROMOTION_ROOK,
+    'b': FLAG_PROMOTION_BISHOP,
+    'n': FLAG_PROMOTION_KNIGHT,
+}
+PROMO_CHARS = {flag: char for char, flag in PROMO_FLAGS.items()}
+
+
 class UCIEngine:
     """UCI protocol handler for the chess engine."""
     
@@ -23,6 +38,7 @@ class UCIEngine:
         self.search = Search(tt_size_mb=64, max_depth=64)
         self.debug = False
         self.running = True
+        engine.warmup()  # JIT-compile kernels now, not on the first 'go'
         
     def send(self, message: str):
         """Send message to GUI."""
@@ -99,34 +115,30 @@ class UCIEngine:
         """
         if len(move_str) < 4:
             return
-        
-        from_sq = (ord(move_str[0]) - ord('a')) + (int(move_str[1]) - 1) * 8
-        to_sq = (ord(move_str[2]) - ord('a')) + (int(move_str[3]) - 1) * 8
-        
-        # Get promotion piece if any
+
+        # Square 0 = a8 in the bitboard layout, so rank N maps to row 8-N
+        from_sq = (ord(move_str[0]) - ord('a')) + (8 - int(move_str[1])) * 8
+        to_sq = (ord(move_str[2]) - ord('a')) + (8 - int(move_str[3])) * 8
+
+        # Get promotion flag if any
         promotion = 0
         if len(move_str) == 5:
-            promo_char = move_str[4].lower()
-            promo_map = {'q': 4, 'r': 3, 'b': 2, 'n': 1}
-            promotion = promo_map.get(promo_char, 0)
-        
+            promotion = PROMO_FLAGS.get(move_str[4].lower(), 0)
+
         # Find matching legal move
         moves_gen = Moves(self.board)
         legal_moves = moves_gen.generate()
-        
+
         for move in legal_moves:
             move_from = move & 0x3F
             move_to = (move >> 6) & 0x3F
-            move_promo = (move >> 12) & 0xF
-            
-            # Check for promotion flag (8)
-            is_promotion = (move_promo & 8) != 0
-            
+            move_flags = (move >> 12) & 0xF
+
+            is_promotion = FLAG_PROMOTION_QUEEN <= move_flags <= FLAG_PROMOTION_KNIGHT
+
             if move_from == from_sq and move_to == to_sq:
                 if is_promotion:
-                    # Extract promotion piece type (bits 0-2)
-                    promo_piece = move_promo & 0x7
-                    if promo_piece == promotion:
+                    if move_flags == promotion:
                         self.board.make_move(move)
                         return
                 else:
@@ -187,21 +199,17 @@ class UCIEngine:
         from_sq = move & 0x3F
         to_sq = (move >> 6) & 0x3F
         flags = (move >> 12) & 0xF
-        
+
         from_file = chr(ord('a') + (from_sq % 8))
-        from_rank = str((from_sq // 8) + 1)
+        from_rank = str(8 - (from_sq // 8))
         to_file = chr(ord('a') + (to_sq % 8))
-        to_rank = str((to_sq // 8) + 1)
-        
+        to_rank = str(8 - (to_sq // 8))
+
         move_str = f"{from_file}{from_rank}{to_file}{to_rank}"
-        
-        # Check for promotion (bit 3 set)
-        if flags & 8:
-            promo_piece = flags & 0x7
-            promo_chars = ['n', 'b', 'r', 'q']
-            if promo_piece < 4:
-                move_str += promo_chars[promo_piece]
-        
+
+        if FLAG_PROMOTION_QUEEN <= flags <= FLAG_PROMOTION_KNIGHT:
+            move_str += PROMO_CHARS[flags]
+
         return move_str
     
     def setoption(self, args: list):